@@ -1,21 +1,112 @@
-CREATE TYPE file_extension AS ENUM ('.jpg', '.png', '.gif');
+CREATE TYPE file_extension AS ENUM ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif');
 
+-- images and image_variants are range-partitioned by month on upload_time.
+-- Partitions are named <table>_pYYYYMM and created ahead of time by
+-- ensure_image_partitions(); retention drops whole months at once.
 CREATE TABLE images (
-    id SERIAL PRIMARY KEY,
+    id BIGINT GENERATED ALWAYS AS IDENTITY,
+    key UUID NOT NULL,
     filename VARCHAR(255) NOT NULL,
     original_name VARCHAR(255) NOT NULL,
     size INTEGER NOT NULL CHECK (size > 0),
-    upload_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    file_type file_extension NOT NULL
-);
+    upload_time TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'UTC'),
+    file_type file_extension NOT NULL,
+    phash BIGINT,
+    PRIMARY KEY (id, upload_time),
+    -- A unique constraint on a partitioned table has to include upload_time.
+    -- The application stores the time encoded in the UUIDv7 key as
+    -- upload_time, so this is unique per key and a filename lookup probes the
+    -- 16-byte index of a single partition.
+    CONSTRAINT uq_images_key UNIQUE (key, upload_time)
+) PARTITION BY RANGE (upload_time);
 
-CREATE INDEX idx_images_filename ON images(filename);
 CREATE INDEX idx_images_upload_time ON images(upload_time);
 
-COMMENT ON TABLE images IS 'Stores metadata for uploaded image files';
+-- No foreign key to images: a referenced partition cannot be dropped while
+-- rows point at it. The repository deletes variants together with their
+-- image, and retention drops the matching variant partition.
+CREATE TABLE image_variants (
+    id BIGINT GENERATED ALWAYS AS IDENTITY,
+    image_id BIGINT NOT NULL,
+    upload_time TIMESTAMP NOT NULL,
+    filename VARCHAR(255) NOT NULL,
+    file_type file_extension NOT NULL,
+    size INTEGER NOT NULL CHECK (size > 0),
+    width INTEGER NOT NULL CHECK (width > 0),
+    height INTEGER NOT NULL CHECK (height > 0),
+    PRIMARY KEY (id, upload_time),
+    UNIQUE (image_id, file_type, upload_time)
+) PARTITION BY RANGE (upload_time);
+
+CREATE FUNCTION ensure_image_partitions(
+    start_month DATE DEFAULT CURRENT_DATE,
+    months_ahead INTEGER DEFAULT 3
+) RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start DATE := date_trunc('month', start_month)::date;
+    last_month DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => months_ahead))::date;
+    parent TEXT;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    -- Every worker calls this on startup; serialise them.
+    PERFORM pg_advisory_xact_lock(hashtext('ensure_image_partitions'));
+
+    WHILE month_start <= last_month LOOP
+        FOREACH parent IN ARRAY ARRAY['images', 'image_variants'] LOOP
+            partition_name := parent || '_p' || to_char(month_start, 'YYYYMM');
+            IF to_regclass(partition_name) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, parent, month_start, (month_start + INTERVAL '1 month')::date
+                );
+                created := created + 1;
+            END IF;
+        END LOOP;
+        month_start := (month_start + INTERVAL '1 month')::date;
+    END LOOP;
+
+    RETURN created;
+END;
+$$;
+
+SELECT ensure_image_partitions();
+
+-- Ids of the notifications sent on the image_events channel; shared by all
+-- workers so SSE clients can resume with Last-Event-ID on any of them.
+CREATE SEQUENCE image_events_seq AS BIGINT;
+
+CREATE TABLE image_stats_daily (
+    day DATE NOT NULL,
+    file_type file_extension NOT NULL,
+    image_count BIGINT NOT NULL DEFAULT 0,
+    total_bytes BIGINT NOT NULL DEFAULT 0,
+    variant_bytes BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, file_type)
+);
+
+COMMENT ON TABLE images IS 'Stores metadata for uploaded image files, partitioned by month of upload_time';
 COMMENT ON COLUMN images.id IS 'Unique identifier for each image';
-COMMENT ON COLUMN images.filename IS 'Name of the file in the storage system';
+COMMENT ON COLUMN images.key IS 'UUIDv7 embedded in filename; its timestamp is upload_time';
+COMMENT ON COLUMN images.filename IS 'Name of the file in the storage system: <prefix>_<key><file_type>';
 COMMENT ON COLUMN images.original_name IS 'Original name of the file when it was uploaded';
 COMMENT ON COLUMN images.size IS 'Size of the file in bytes';
-COMMENT ON COLUMN images.upload_time IS 'When the file was uploaded';
-COMMENT ON COLUMN images.file_type IS 'File extension (.jpg, .png, or .gif)';
+COMMENT ON COLUMN images.upload_time IS 'When the file was uploaded (UTC)';
+COMMENT ON COLUMN images.file_type IS 'File extension of the stored original';
+COMMENT ON COLUMN images.phash IS '64-bit difference hash of the image (signed), used for near-duplicate lookup';
+
+COMMENT ON TABLE image_variants IS 'Re-encoded copies of an image in modern formats, served by content negotiation';
+COMMENT ON COLUMN image_variants.image_id IS 'Image this variant was produced from';
+COMMENT ON COLUMN image_variants.upload_time IS 'upload_time of the image, so the variant lands in the same monthly partition';
+COMMENT ON COLUMN image_variants.filename IS 'Name of the variant file in the storage system';
+COMMENT ON COLUMN image_variants.file_type IS 'Variant format (.webp or .avif)';
+COMMENT ON COLUMN image_variants.size IS 'Size of the variant file in bytes';
+
+COMMENT ON FUNCTION ensure_image_partitions(DATE, INTEGER) IS 'Creates missing monthly partitions from start_month up to months_ahead months past the current one';
+
+COMMENT ON TABLE image_stats_daily IS 'Per-day, per-type upload totals, kept in step with images by the repository';
+COMMENT ON COLUMN image_stats_daily.day IS 'Upload date of the counted images';
+COMMENT ON COLUMN image_stats_daily.image_count IS 'Number of stored images';
+COMMENT ON COLUMN image_stats_daily.total_bytes IS 'Combined size of the stored originals in bytes';
+COMMENT ON COLUMN image_stats_daily.variant_bytes IS 'Combined size of their WebP/AVIF variants in bytes';
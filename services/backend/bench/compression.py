@@ -0,0 +1,92 @@
+"""Transfer-size measurements for response compression.
+
+Offline, for a synthetic ``GET /upload/`` page at each gzip level (size and CPU
+time, plus the level JSONCompressionMiddleware picks):
+    python -m bench.compression --items 20
+
+Against a running stack, bytes on the wire with and without Accept-Encoding:
+    python -m bench.compression --url http://localhost
+"""
+import argparse
+import gzip
+import json
+import time
+
+from bench.environment import prepare_environment
+
+prepare_environment()
+
+import httpx
+
+from src.db.dto import ImageDetailsDTO
+from src.middleware.compression import level_for_size
+
+
+URL_PATHS = (
+    "/upload.html",
+    "/css/upload.css",
+    "/js/upload.js",
+    "/api/upload/?per_page=20",
+)
+
+
+def list_payload(items: int) -> bytes:
+    images = [
+        ImageDetailsDTO(
+            id=i,
+            filename=f"holiday_photo_{i}_0b6f1c2e-4d7a-4f3e-9a1b-{i:012d}.jpg",
+            original_filename=f"Holiday photo {i}.jpg",
+            size=1_500_000 + i,
+            file_type=".jpg",
+            upload_time=f"2026-01-{1 + i % 28:02d}T12:{i % 60:02d}:00",
+        )
+        for i in range(items)
+    ]
+    body = {
+        "items": [img.as_dict() for img in images],
+        "pagination": {"page": 1, "per_page": items, "total": 100_000, "pages": 100_000 // items},
+    }
+    return json.dumps(body).encode()
+
+
+def offline(items: int, repeat: int) -> None:
+    body = list_payload(items)
+    print(f"GET /upload/ with {items} items: {len(body)} bytes raw, middleware level {level_for_size(len(body))}")
+    print(f"{'level':>6}{'bytes':>10}{'ratio':>8}{'µs/op':>10}")
+    for level in range(1, 10):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            compressed = gzip.compress(body, compresslevel=level)
+        elapsed = (time.perf_counter() - started) / repeat
+        print(f"{level:>6}{len(compressed):>10}{len(compressed) / len(body):>8.2f}{elapsed * 1e6:>10.1f}")
+
+
+def online(url: str) -> None:
+    print(f"{'path':<32}{'identity':>10}{'gzip':>10}{'br':>10}")
+    with httpx.Client(base_url=url, timeout=10.0) as client:
+        for path in URL_PATHS:
+            sizes = []
+            for encoding in ("identity", "gzip", "br"):
+                with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+                    for _ in response.iter_raw():
+                        pass
+                    used = response.headers.get("content-encoding", "identity")
+                    sizes.append(f"{response.num_bytes_downloaded}" if used == encoding else "-")
+            print(f"{path:<32}{sizes[0]:>10}{sizes[1]:>10}{sizes[2]:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response compression measurements")
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--url", default=None, help="measure a running stack instead")
+    args = parser.parse_args()
+
+    if args.url:
+        online(args.url)
+    else:
+        offline(args.items, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+
+BENCH_DIR = os.path.join(tempfile.gettempdir(), "upload-server-bench")
+
+DEFAULTS = {
+    "IMAGE_DIR": os.path.join(BENCH_DIR, "images"),
+    "LOG_DIR": os.path.join(BENCH_DIR, "logs"),
+    "WEB_SERVER_WORKERS": "1",
+    "WEB_SERVER_START_PORT": "8000",
+    "POSTGRES_DB": "upload_images_db",
+    "POSTGRES_DB_PORT": "5432",
+    "POSTGRES_USER": "admin",
+    "POSTGRES_PASSWORD": "admin",
+    "POSTGRES_HOST": "localhost",
+    "PGBOUNCER_USER": "admin",
+    "PGBOUNCER_PASSWORD": "admin",
+    "PGBOUNCER_HOST": "localhost",
+    "PGBOUNCER_PORT": "6432",
+    "USE_PGBOUNCER": "false",
+    # Every bench client connects from the same address and would share one bucket.
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+def prepare_environment() -> None:
+    # Values from the real environment (or services/backend/.env) always win,
+    # so the same scripts run against docker-compose and a bare local Postgres.
+    for key, value in DEFAULTS.items():
+        os.environ.setdefault(key, value)
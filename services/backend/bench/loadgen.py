@@ -0,0 +1,142 @@
+"""Mixed-workload load generator for the upload server.
+
+In-process (ASGI, also reports DB queries per request):
+    python -m bench.loadgen --target asgi --duration 30 --concurrency 16
+
+Over HTTP against a running server (nginx or a single worker):
+    python -m bench.loadgen --target http --url http://localhost/api --duration 30
+
+Compare against / record a baseline:
+    python -m bench.loadgen --baseline bench/results/baseline.json
+    python -m bench.loadgen --save bench/results/baseline.json
+"""
+import argparse
+import asyncio
+import platform
+import random
+import sys
+import time
+from contextlib import asynccontextmanager, nullcontext
+from pathlib import Path
+from typing import AsyncIterator, Dict
+
+from bench.environment import prepare_environment
+
+prepare_environment()
+
+import httpx
+
+from bench import queries
+from bench.report import Recorder, find_regressions, format_table, load_baseline, save_report
+from bench.workloads import OPERATIONS, WorkloadState, parse_mix
+
+
+@asynccontextmanager
+async def make_client(target: str, url: str) -> AsyncIterator[httpx.AsyncClient]:
+    timeout = httpx.Timeout(30.0)
+    if target == "http":
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+            yield client
+        return
+
+    from src.app import app
+
+    queries.install()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            await wait_until_ready(client)
+            yield client
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while (await client.get("/health/ready")).status_code != 200:
+        if time.perf_counter() > deadline:
+            raise RuntimeError("Server did not become ready")
+        await asyncio.sleep(0.1)
+
+
+async def worker(
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        mix: Dict[str, int],
+        deadline: float,
+        count_queries: bool,
+        seed: int,
+):
+    state = WorkloadState(rng=random.Random(seed))
+    names, weights = list(mix), list(mix.values())
+
+    while time.perf_counter() < deadline:
+        operation = OPERATIONS[state.rng.choices(names, weights)[0]]
+        with (queries.count_queries() if count_queries else nullcontext()) as counter:
+            started = time.perf_counter()
+            try:
+                endpoint, status = await operation(client, state)
+            except httpx.HTTPError:
+                endpoint, status = operation.__name__, 599
+            latency = time.perf_counter() - started
+        recorder.record(endpoint, latency, status, counter["queries"] if counter is not None else None)
+
+
+async def run(args) -> Dict[str, dict]:
+    mix = parse_mix(args.mix)
+    recorder = Recorder()
+
+    async with make_client(args.target, args.url) as client:
+        # Warm up connections, Pillow plugins and the listing cache of known filenames.
+        await client.get("/upload/", params={"per_page": 20})
+
+        deadline = time.perf_counter() + args.duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            worker(client, recorder, mix, deadline, args.target == "asgi", args.seed + i)
+            for i in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return recorder.summary(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload server load generator")
+    parser.add_argument("--target", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=None, help="e.g. list=40,detail=35,upload=15,delete=10")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", type=Path, default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", type=Path, default=None, help="compare against this JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression vs baseline")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    baseline = load_baseline(args.baseline) if args.baseline else None
+
+    print(format_table(summary, baseline))
+
+    if args.save:
+        meta = {
+            "target": args.target,
+            "url": args.url if args.target == "http" else None,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "mix": parse_mix(args.mix),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        save_report(args.save, summary, meta)
+
+    if baseline:
+        regressions = find_regressions(summary, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
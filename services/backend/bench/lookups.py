@@ -0,0 +1,177 @@
+"""Point-lookup latency of GET /upload/{filename} at the repository level.
+
+Times ``get_by_filename`` for filenames sampled from a seeded table, with
+and without the per-worker cache, from one thread and from several, plus
+lookups of names that do not exist. ``--filename-index`` builds a temporary
+btree on the full filename, the index this lookup used to rely on, and
+compares its size and latency with the key index.
+
+    python -m bench.seed --rows 10000000 --days 730 --reset
+    python -m bench.lookups --samples 20000 --threads 8 --filename-index
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+
+from bench.environment import prepare_environment
+
+prepare_environment()
+
+import psycopg
+
+from bench import queries
+from bench.partitions import scanned_partitions
+from bench.report import percentile
+from src.db.cache import TTLCache
+from src.db.keys import build_filename, key_from_filename, key_time, new_image_key
+from src.db.repositories import PostgresImageRepository
+from src.db.session import close_connection_pool, get_connection_pool
+from src.settings.config import config
+
+
+def sample_filenames(conn: psycopg.Connection, count: int) -> List[str]:
+    with conn.cursor() as cur:
+        cur.execute("SELECT sum(reltuples)::bigint FROM pg_class WHERE relname LIKE 'images\\_p%%' AND relkind = 'r'")
+        rows = max(cur.fetchone()[0] or 0, 1)
+        percent = min(100.0, count * 200.0 / rows)
+        cur.execute(f"SELECT filename FROM images TABLESAMPLE SYSTEM ({percent}) LIMIT %s", (count,))
+        filenames = [row[0] for row in cur.fetchall()]
+    random.shuffle(filenames)
+    return filenames
+
+
+def time_lookups(lookup: Callable[[str], object], filenames: Sequence[str]) -> List[float]:
+    timings = []
+    for filename in filenames:
+        started = time.perf_counter()
+        lookup(filename)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def time_concurrent(lookup: Callable[[str], object], filenames: Sequence[str], threads: int):
+    chunks = [filenames[i::threads] for i in range(threads)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        timings = [t for chunk in executor.map(lambda c: time_lookups(lookup, c), chunks) for t in chunk]
+    return timings, time.perf_counter() - started
+
+
+def describe(timings: List[float], elapsed: float) -> str:
+    return (
+        f"p50 {statistics.median(timings):7.3f} ms  p95 {percentile(timings, 95):7.3f} ms  "
+        f"p99 {percentile(timings, 99):7.3f} ms  {len(timings) / elapsed:9.0f} lookups/s"
+    )
+
+
+def report(name: str, timings: List[float], elapsed: Optional[float] = None) -> None:
+    print(f"  {name:<26} {describe(timings, elapsed or sum(timings) / 1000)}")
+
+
+def index_size(conn: psycopg.Connection, pattern: str) -> int:
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT COALESCE(sum(pg_relation_size(oid)), 0) FROM pg_class WHERE relkind = 'i' AND relname LIKE %s",
+            (pattern,),
+        )
+        return cur.fetchone()[0]
+
+
+def compare_filename_index(conn: psycopg.Connection, filenames: Sequence[str]) -> None:
+    print("building a temporary index on images(filename)...")
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        cur.execute("CREATE INDEX bench_images_filename ON images (filename)")
+    conn.commit()
+    print(f"  built in {time.perf_counter() - started:.1f}s")
+    try:
+        key_bytes = index_size(conn, "images\\_p%\\_key\\_upload\\_time\\_key")
+        filename_bytes = index_size(conn, "images\\_p%\\_filename\\_idx")
+        print(f"  index size: key {key_bytes / 2**20:8.1f} MiB   filename {filename_bytes / 2**20:8.1f} MiB")
+
+        # Same single statement through both indexes, without the variants query.
+        by_key = "SELECT id FROM images WHERE key = %s AND upload_time = %s AND filename = %s"
+        by_filename = "SELECT id FROM images WHERE filename = %s"
+        with conn.cursor() as cur:
+            def lookup_key(filename):
+                key = key_from_filename(filename)
+                cur.execute(by_key, (key, key_time(key), filename))
+                return cur.fetchone()
+
+            def lookup_filename(filename):
+                cur.execute(by_filename, (filename,))
+                return cur.fetchone()
+
+            key_timings = time_lookups(lookup_key, filenames)
+            filename_timings = time_lookups(lookup_filename, filenames)
+        conn.rollback()
+        report("key index (raw SQL)", key_timings)
+        report("filename index (raw SQL)", filename_timings)
+        planned, scanned = scanned_partitions(conn, by_filename, (filenames[0],))
+        print(f"  filename index probes {scanned} of {planned} partitions")
+    finally:
+        with conn.cursor() as cur:
+            cur.execute("DROP INDEX bench_images_filename")
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filename point-lookup benchmark")
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--filename-index", action="store_true", help="compare with a temporary filename index")
+    parser.add_argument("--dsn", default=None, help="defaults to the direct Postgres URL from config")
+    args = parser.parse_args()
+
+    queries.install()
+    pool = get_connection_pool()
+    uncached = PostgresImageRepository(pool)
+    cached = PostgresImageRepository(pool, TTLCache(max(args.samples, 1), 3600.0))
+
+    with psycopg.connect(args.dsn or config.database_url) as conn:
+        filenames = sample_filenames(conn, args.samples)
+        if not filenames:
+            sys.exit("images is empty; run bench.seed first")
+        missing = [build_filename("missing", new_image_key(), ".jpg") for _ in range(len(filenames))]
+        print(f"{len(filenames)} sampled filenames")
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM pg_inherits WHERE inhparent = 'images'::regclass")
+            partitions = cur.fetchone()[0]
+        conn.rollback()
+
+        # Warm the pool and the buffer cache so the first rows measure lookups, not I/O.
+        time_lookups(uncached.get_by_filename, filenames[:1000])
+
+        hits = [uncached.get_by_filename(f) is not None for f in filenames[:100]]
+        if not all(hits):
+            sys.exit(f"{hits.count(False)} of {len(hits)} sampled filenames were not found")
+
+        print(f"get_by_filename over {partitions} partitions:")
+        report("key index", time_lookups(uncached.get_by_filename, filenames))
+        report("key index, missing names", time_lookups(uncached.get_by_filename, missing))
+        timings, elapsed = time_concurrent(uncached.get_by_filename, filenames, args.threads)
+        report(f"key index, {args.threads} threads", timings, elapsed)
+
+        time_lookups(cached.get_by_filename, filenames)
+        report("cache hit", time_lookups(cached.get_by_filename, filenames))
+        timings, elapsed = time_concurrent(cached.get_by_filename, filenames, args.threads)
+        report(f"cache hit, {args.threads} threads", timings, elapsed)
+
+        with queries.capture_queries() as captured:
+            uncached.get_by_filename(filenames[0])
+        planned, scanned = scanned_partitions(conn, *captured[0])
+        print(f"  key index probes {scanned} of {planned} partitions")
+
+        if args.filename_index:
+            compare_filename_index(conn, filenames)
+
+    close_connection_pool()
+
+
+if __name__ == "__main__":
+    main()
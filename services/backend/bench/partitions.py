@@ -0,0 +1,118 @@
+"""Checks that repository queries prune the monthly partitions of ``images``.
+
+Calls the repository methods against a seeded database, captures the SQL
+they send and re-runs each SELECT under EXPLAIN (ANALYZE, FORMAT JSON) to
+count the partitions that were planned and actually scanned.
+
+    python -m bench.seed --rows 1000000 --days 730 --reset
+    python -m bench.partitions
+"""
+import argparse
+import datetime
+import json
+import sys
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from bench.environment import prepare_environment
+
+prepare_environment()
+
+import psycopg
+
+from bench import queries
+from src.db.dependencies import get_image_repository
+from src.db.session import close_connection_pool
+from src.settings.config import config
+
+
+PARTITION_PREFIXES = ("images_p", "image_variants_p")
+
+
+def walk(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk(child)
+
+
+def scanned_partitions(conn: psycopg.Connection, query: str, params) -> Tuple[int, int]:
+    """Returns (partitions in the plan, partitions executed at least once)."""
+    with conn.cursor() as cur:
+        cur.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}", params)
+        plan = cur.fetchone()[0]
+    conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    planned, executed = set(), set()
+    for node in walk(plan[0]["Plan"]):
+        relation = node.get("Relation Name", "")
+        if relation.startswith(PARTITION_PREFIXES):
+            planned.add(relation)
+            if node.get("Actual Loops", 0) > 0:
+                executed.add(relation)
+    return len(planned), len(executed)
+
+
+def run_case(conn, name: str, call: Callable[[], object], limit: Optional[int]) -> bool:
+    with queries.capture_queries() as captured:
+        call()
+
+    ok = True
+    for query, params in captured:
+        if not query.lstrip().upper().startswith("SELECT"):
+            continue
+        planned, executed = scanned_partitions(conn, query, params)
+        if planned == 0:
+            continue
+        passed = limit is None or executed <= limit
+        ok = ok and passed
+        expectation = "report only" if limit is None else f"<= {limit}"
+        status = "ok" if passed else "FAIL"
+        summary = " ".join(query.split())[:70]
+        print(f"  {name:<22} planned {planned:>3}  scanned {executed:>3}  ({expectation}) {status}  {summary}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify partition pruning of repository queries")
+    parser.add_argument("--dsn", default=None, help="defaults to the direct Postgres URL from config")
+    args = parser.parse_args()
+
+    queries.install()
+    repository = get_image_repository()
+    months = repository.list_partition_months()
+    if not months:
+        sys.exit("images is not partitioned or has no partitions; run bench.seed first")
+
+    now = datetime.datetime.now()
+    recent = repository.list_all(1, 0, "desc")
+    # Newest non-empty partition plus the empty ones created ahead of time.
+    ordered_limit = config.PARTITION_MONTHS_AHEAD + 2
+
+    cases: List[Tuple[str, Callable[[], object], Optional[int]]] = [
+        ("list newest page", lambda: repository.list_all(10, 0, "desc"), ordered_limit),
+        ("list oldest page", lambda: repository.list_all(10, 0, "asc"), 2),
+        ("list last 7 days", lambda: repository.list_all(10, 0, "desc", now - datetime.timedelta(days=7), now), 2),
+        ("count last 30 days", lambda: repository.count(now - datetime.timedelta(days=30), now), 2),
+        # Open-ended windows also reach the empty partitions created ahead of time.
+        ("count since 30 days", lambda: repository.count(now - datetime.timedelta(days=30)), ordered_limit),
+        ("count one month", lambda: repository.count(
+            datetime.datetime(months[0].year, months[0].month, 1),
+            datetime.datetime(months[1].year, months[1].month, 1) if len(months) > 1 else None,
+        ), 1),
+    ]
+    if recent:
+        cases.append(("details by filename", lambda: repository.get_by_filename(recent[0].filename), 1))
+
+    print(f"{len(months)} monthly partitions ({months[0]:%Y-%m} .. {months[-1]:%Y-%m})")
+    ok = True
+    with psycopg.connect(args.dsn or config.database_url) as conn:
+        for name, call, limit in cases:
+            ok = run_case(conn, name, call, limit) and ok
+    close_connection_pool()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
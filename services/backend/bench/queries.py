@@ -0,0 +1,74 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+import psycopg
+
+
+_current: ContextVar[Optional[Counter]] = ContextVar("bench_query_counter", default=None)
+_captured: ContextVar[Optional[List[Tuple[str, object]]]] = ContextVar("bench_query_capture", default=None)
+_installed = False
+
+
+def _record(query, params) -> None:
+    counter = _current.get()
+    if counter is not None:
+        counter["queries"] += 1
+    captured = _captured.get()
+    if captured is not None:
+        captured.append((query, params))
+
+
+def install() -> None:
+    global _installed
+    if _installed:
+        return
+
+    # ServerCursor overrides execute, so named cursors are patched separately.
+    for cursor_class in (psycopg.Cursor, psycopg.ServerCursor):
+        original_execute = cursor_class.execute
+
+        def counting_execute(self, query, params=None, *, _original=original_execute, **kwargs):
+            _record(query, params)
+            return _original(self, query, params, **kwargs)
+
+        cursor_class.execute = counting_execute
+
+    original_executemany = psycopg.Cursor.executemany
+    original_copy = psycopg.Cursor.copy
+
+    def counting_executemany(self, query, params_seq, **kwargs):
+        # One statement per parameter set reaches the server, pipelined or not.
+        params_seq = list(params_seq)
+        for params in params_seq:
+            _record(query, params)
+        return original_executemany(self, query, params_seq, **kwargs)
+
+    def counting_copy(self, statement, params=None, **kwargs):
+        _record(statement, params)
+        return original_copy(self, statement, params, **kwargs)
+
+    psycopg.Cursor.executemany = counting_executemany
+    psycopg.Cursor.copy = counting_copy
+    _installed = True
+
+
+@contextmanager
+def count_queries() -> Iterator[Counter]:
+    counter: Counter = Counter()
+    token = _current.set(counter)
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def capture_queries() -> Iterator[List[Tuple[str, object]]]:
+    captured: List[Tuple[str, object]] = []
+    token = _captured.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured.reset(token)
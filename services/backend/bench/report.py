@@ -0,0 +1,99 @@
+import json
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    queries: List[int] = field(default_factory=list)
+
+    def record(self, latency: float, status: int, queries: Optional[int]) -> None:
+        self.latencies.append(latency)
+        if status >= 400:
+            self.errors += 1
+        if queries is not None:
+            self.queries.append(queries)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+class Recorder:
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+
+    def record(self, endpoint: str, latency: float, status: int, queries: Optional[int] = None) -> None:
+        self.endpoints[endpoint].record(latency, status, queries)
+
+    def summary(self, elapsed: float) -> Dict[str, dict]:
+        result = {}
+        for endpoint, stats in sorted(self.endpoints.items()):
+            result[endpoint] = {
+                "requests": len(stats.latencies),
+                "errors": stats.errors,
+                "throughput_rps": round(len(stats.latencies) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(stats.latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(stats.latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(stats.latencies, 99) * 1000, 2),
+                "db_queries_per_request": (
+                    round(sum(stats.queries) / len(stats.queries), 2) if stats.queries else None
+                ),
+            }
+        return result
+
+
+def format_table(summary: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> str:
+    header = f"{'endpoint':<28}{'reqs':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+    if baseline:
+        header += f"{'Δrps':>9}{'Δp95':>9}"
+    lines = [header, "-" * len(header)]
+    for endpoint, row in summary.items():
+        queries = row["db_queries_per_request"]
+        line = (
+            f"{endpoint:<28}{row['requests']:>8}{row['errors']:>6}{row['throughput_rps']:>10}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+            f"{'n/a' if queries is None else queries:>9}"
+        )
+        if baseline and endpoint in baseline:
+            line += f"{_delta(row['throughput_rps'], baseline[endpoint]['throughput_rps']):>9}"
+            line += f"{_delta(row['p95_ms'], baseline[endpoint]['p95_ms']):>9}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _delta(current: float, previous: float) -> str:
+    if not previous:
+        return "n/a"
+    return f"{(current - previous) / previous * 100:+.1f}%"
+
+
+def find_regressions(summary: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    for endpoint, row in summary.items():
+        previous = baseline.get(endpoint)
+        if not previous:
+            continue
+        if previous["throughput_rps"] and row["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{endpoint}: throughput {previous['throughput_rps']} → {row['throughput_rps']} rps")
+        if previous["p95_ms"] and row["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {previous['p95_ms']} → {row['p95_ms']} ms")
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, dict]:
+    return json.loads(path.read_text(encoding="utf-8"))["endpoints"]
+
+
+def save_report(path: Path, summary: Dict[str, dict], meta: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"meta": meta, "endpoints": summary}, indent=2), encoding="utf-8")
@@ -0,0 +1,115 @@
+"""Seed a local Postgres with synthetic ``images`` rows for benchmarking.
+
+    python -m bench.seed --rows 100000 --reset
+"""
+import argparse
+import datetime
+import random
+import time
+import uuid
+from pathlib import Path
+
+from bench.environment import prepare_environment
+
+prepare_environment()
+
+import psycopg
+
+from src.db.keys import EPOCH, build_filename
+from src.settings.config import config
+
+
+SCHEMA_FILE = Path(__file__).resolve().parents[3] / "init-sql" / "create-tables.sql"
+FILE_TYPES = (".jpg", ".png", ".gif")
+
+
+def ensure_schema(conn: psycopg.Connection, schema_file: Path = SCHEMA_FILE) -> None:
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('public.images')")
+        if cur.fetchone()[0] is None:
+            cur.execute(schema_file.read_text(encoding="utf-8"))
+    conn.commit()
+
+
+def reset(conn: psycopg.Connection) -> None:
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE images, image_variants, image_stats_daily RESTART IDENTITY")
+    conn.commit()
+
+
+def uuid7_at(ms: int, rng: random.Random) -> uuid.UUID:
+    """A UUIDv7 for a given millisecond, so seeded rows look like past uploads."""
+    return uuid.UUID(int=(ms << 80) | (7 << 76) | (rng.getrandbits(12) << 64) | (0b10 << 62) | rng.getrandbits(62))
+
+
+def generate_rows(count: int, days: int, rng: random.Random):
+    now_ms = int((datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - EPOCH).total_seconds() * 1000)
+    for i in range(count):
+        file_type = rng.choice(FILE_TYPES)
+        ms = now_ms - rng.randrange(days * 86_400_000)
+        key = uuid7_at(ms, rng)
+        yield (
+            key,
+            build_filename(f"bench_{i}", key, file_type),
+            f"bench_{i}{file_type}",
+            rng.randint(10 * 1024, 5 * 1024 * 1024),
+            EPOCH + datetime.timedelta(milliseconds=ms),
+            file_type,
+        )
+
+
+def seed(conn: psycopg.Connection, rows: int, days: int = 365, seed_value: int = 0) -> None:
+    rng = random.Random(seed_value)
+    copy_sql = "COPY images (key, filename, original_name, size, upload_time, file_type) FROM STDIN"
+    with conn.cursor() as cur:
+        # Rows are spread over the past, which has no partitions on a fresh schema.
+        cur.execute(
+            "SELECT ensure_image_partitions(%s)",
+            (datetime.date.today() - datetime.timedelta(days=days + 1),),
+        )
+        with cur.copy(copy_sql) as copy:
+            for row in generate_rows(rows, days, rng):
+                copy.write_row(row)
+        cur.execute("ANALYZE images")
+    conn.commit()
+    rebuild_stats(conn)
+
+
+def rebuild_stats(conn: psycopg.Connection) -> None:
+    """COPY bypasses the repository, so recompute the upload rollup from scratch."""
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM image_stats_daily")
+        cur.execute(
+            """
+            INSERT INTO image_stats_daily (day, file_type, image_count, total_bytes, variant_bytes)
+            SELECT i.upload_time::date, i.file_type, count(*), sum(i.size),
+                   COALESCE(sum((SELECT sum(v.size) FROM image_variants v WHERE v.image_id = i.id)), 0)
+            FROM images i
+            GROUP BY 1, 2
+            """
+        )
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the images table with synthetic rows")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365, help="spread upload_time over this many days")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="truncate images before seeding")
+    parser.add_argument("--dsn", default=None, help="defaults to the direct Postgres URL from config")
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn or config.database_url) as conn:
+        ensure_schema(conn)
+        if args.reset:
+            reset(conn)
+        started = time.perf_counter()
+        seed(conn, args.rows, args.days, args.seed)
+        elapsed = time.perf_counter() - started
+
+    print(f"Seeded {args.rows} rows in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
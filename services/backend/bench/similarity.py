@@ -0,0 +1,76 @@
+"""Lookup latency of the perceptual-hash index.
+
+Builds a HammingIndex over N random 64-bit hashes (with planted near
+duplicates) and times searches at several radii against a NumPy full scan.
+
+    python -m bench.similarity --hashes 1000000 --queries 500
+"""
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+from src.similarity.index import HammingIndex
+
+
+def planted_hashes(count: int, planted: int, rng: random.Random) -> np.ndarray:
+    hashes = np.frombuffer(rng.randbytes(count * 8), dtype=np.uint64).copy()
+    # Each planted hash is a copy of another one with a few bits flipped.
+    for _ in range(planted):
+        source, target = rng.randrange(count), rng.randrange(count)
+        value = int(hashes[source])
+        for bit in rng.sample(range(64), rng.randint(1, 6)):
+            value ^= 1 << bit
+        hashes[target] = value
+    return hashes
+
+
+def time_queries(search, queries) -> list:
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def describe(timings: list) -> str:
+    ordered = sorted(timings)
+    p99 = ordered[max(0, int(len(ordered) * 0.99) - 1)]
+    return f"p50 {statistics.median(ordered):8.3f} ms   p99 {p99:8.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perceptual-hash index lookup benchmark")
+    parser.add_argument("--hashes", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--radii", default="0,4,7,10")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hashes = planted_hashes(args.hashes, args.hashes // 100, rng)
+
+    index = HammingIndex()
+    started = time.perf_counter()
+    index.add_many(range(1, len(hashes) + 1), (int(h) for h in hashes))
+    index.search(0, 0)
+    print(f"built index over {len(index)} hashes in {time.perf_counter() - started:.2f}s")
+
+    queries = [int(hashes[rng.randrange(len(hashes))]) for _ in range(args.queries)]
+
+    def full_scan(query, radius):
+        distances = np.bitwise_count(hashes ^ np.uint64(query))
+        return np.flatnonzero(distances <= radius)
+
+    print(f"{'radius':>6}  {'index':<36}{'full scan':<36}")
+    for radius in (int(r) for r in args.radii.split(",")):
+        indexed = time_queries(lambda q: index.search(q, radius), queries)
+        scanned = time_queries(lambda q: full_scan(q, radius), queries[: max(1, len(queries) // 10)])
+        print(f"{radius:>6}  {describe(indexed):<36}{describe(scanned):<36}")
+
+
+if __name__ == "__main__":
+    main()
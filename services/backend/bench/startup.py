@@ -0,0 +1,111 @@
+"""Cold-boot benchmark for the upload worker.
+
+Measures, in fresh interpreters, how long ``import src.app`` takes (with the
+slowest modules from ``-X importtime``) and, with ``--ready``, how long the
+lifespan needs until ``/health/ready`` answers 200.
+
+    python -m bench.startup --runs 10 --budget-ms 400
+    python -m bench.startup --runs 5 --ready
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from bench.environment import prepare_environment
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+IMPORT_PROBE = """
+import time
+started = time.perf_counter()
+import src.app
+print(f"import_ms={(time.perf_counter() - started) * 1000:.2f}")
+"""
+
+READY_PROBE = """
+import asyncio, time
+started = time.perf_counter()
+import src.app
+print(f"import_ms={(time.perf_counter() - started) * 1000:.2f}")
+import httpx
+
+async def main():
+    app = src.app.app
+    async with app.router.lifespan_context(app):
+        print(f"lifespan_ms={(time.perf_counter() - started) * 1000:.2f}")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            deadline = time.perf_counter() + 60
+            while (await client.get("/health/ready")).status_code != 200:
+                if time.perf_counter() > deadline:
+                    raise SystemExit("not ready after 60 s")
+                await asyncio.sleep(0.01)
+        print(f"ready_ms={(time.perf_counter() - started) * 1000:.2f}")
+
+asyncio.run(main())
+"""
+
+
+def run_probe(code: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", code]
+    return subprocess.run(command, cwd=BACKEND_DIR, env=os.environ.copy(), capture_output=True, text=True, check=True)
+
+
+def parse_metrics(output: str) -> dict:
+    metrics = {}
+    for line in output.splitlines():
+        name, sep, value = line.partition("=")
+        if sep and name.endswith("_ms"):
+            metrics[name] = float(value)
+    return metrics
+
+
+def slowest_imports(stderr: str, top: int) -> list:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, module = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        rows.append((int(self_us), int(cumulative_us), module))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload worker cold-boot benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="show the N slowest modules by self time")
+    parser.add_argument("--ready", action="store_true", help="also measure time to readiness (needs Postgres)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if median import time exceeds this")
+    args = parser.parse_args()
+
+    prepare_environment()
+
+    samples = {}
+    for _ in range(args.runs):
+        probe = READY_PROBE if args.ready else IMPORT_PROBE
+        for name, value in parse_metrics(run_probe(probe).stdout).items():
+            samples.setdefault(name, []).append(value)
+
+    for name, values in samples.items():
+        print(f"{name:<14} median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}")
+
+    print("\nSlowest modules (self time, µs):")
+    for self_us, cumulative_us, module in slowest_imports(run_probe(IMPORT_PROBE, importtime=True).stderr, args.top):
+        print(f"{self_us:>10} {cumulative_us:>10}  {module}")
+
+    if args.budget_ms is not None:
+        median_import = statistics.median(samples["import_ms"])
+        if median_import > args.budget_ms:
+            print(f"\nImport time {median_import:.1f} ms exceeds budget of {args.budget_ms:.1f} ms", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
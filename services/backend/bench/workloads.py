@@ -0,0 +1,107 @@
+import io
+import random
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from PIL import Image
+
+
+UPLOAD_SIZES = {
+    "small": (320, 240),
+    "medium": (1280, 960),
+    "large": (2048, 1536),
+}
+UPLOAD_FORMATS = {".jpg": "JPEG", ".png": "PNG", ".gif": "GIF"}
+
+DEFAULT_MIX = {
+    "list": 40,
+    "detail": 35,
+    "upload": 15,
+    "delete": 10,
+}
+
+
+@lru_cache(maxsize=None)
+def make_image(size: str, ext: str) -> bytes:
+    width, height = UPLOAD_SIZES[size]
+    image = Image.effect_mandelbrot((width, height), (-2.0, -1.2, 1.0, 1.2), 64)
+    if ext != ".gif":
+        image = Image.merge("RGB", (image, image.rotate(180), image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buffer = io.BytesIO()
+    image.save(buffer, format=UPLOAD_FORMATS[ext])
+    return buffer.getvalue()
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation '{name}'. Known: {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight)
+    return mix
+
+
+@dataclass
+class WorkloadState:
+    rng: random.Random
+    known: List[str] = field(default_factory=list)
+    owned: List[str] = field(default_factory=list)
+
+    def remember(self, filename: str, owned: bool = False) -> None:
+        self.known.append(filename)
+        if owned:
+            self.owned.append(filename)
+
+
+Operation = Callable[[httpx.AsyncClient, WorkloadState], Awaitable[Tuple[str, int]]]
+
+
+async def op_list(client: httpx.AsyncClient, state: WorkloadState) -> Tuple[str, int]:
+    page = state.rng.randint(1, 20)
+    order = state.rng.choice(("asc", "desc"))
+    response = await client.get("/upload/", params={"page": page, "per_page": 20, "order": order})
+    if response.status_code == 200 and len(state.known) < 10_000:
+        for item in response.json()["items"]:
+            state.remember(item["filename"])
+    return "GET /upload/", response.status_code
+
+
+async def op_detail(client: httpx.AsyncClient, state: WorkloadState) -> Tuple[str, int]:
+    if not state.known:
+        return await op_list(client, state)
+    filename = state.rng.choice(state.known)
+    response = await client.get(f"/upload/{filename}")
+    return "GET /upload/{filename}", response.status_code
+
+
+async def op_upload(client: httpx.AsyncClient, state: WorkloadState) -> Tuple[str, int]:
+    size = state.rng.choice(tuple(UPLOAD_SIZES))
+    ext = state.rng.choice(tuple(UPLOAD_FORMATS))
+    files = {"file": (f"bench_{size}{ext}", make_image(size, ext), f"image/{UPLOAD_FORMATS[ext].lower()}")}
+    response = await client.post("/upload/", files=files)
+    if response.status_code == 200:
+        state.remember(response.json()["filename"], owned=True)
+    return "POST /upload/", response.status_code
+
+
+async def op_delete(client: httpx.AsyncClient, state: WorkloadState) -> Tuple[str, int]:
+    # Only files uploaded during this run exist on disk; seeded rows are metadata only.
+    if not state.owned:
+        return await op_upload(client, state)
+    filename = state.owned.pop(state.rng.randrange(len(state.owned)))
+    state.known.remove(filename)
+    response = await client.delete(f"/upload/{filename}")
+    return "DELETE /upload/{filename}", response.status_code
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "list": op_list,
+    "detail": op_detail,
+    "upload": op_upload,
+    "delete": op_delete,
+}
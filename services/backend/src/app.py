@@ -1,60 +1,105 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query
-from fastapi.responses import JSONResponse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import iterate_in_threadpool
 from starlette.requests import Request
 
 from src.settings.config import config
 from src.settings.logging_config import get_logger
+from src.lifespan import lifespan
 
-from src.handlers.dependencies import get_file_handler
+from src.handlers.dependencies import get_file_handler, get_image_normalizer
+from src.handlers.images import preferred_variant
 from src.db.dependencies import get_image_repository
+from src.similarity.dependencies import get_similarity_service
+from src.events.dependencies import get_event_broker
+from src.archive.dependencies import get_archive_exporter
 
-from src.db.dto import ImageDTO
+from src.db.dto import ImageDTO, ImageVariantDTO
 from src.dto.file import UploadedFileDTO
 
-from src.exceptions.api_errors import APIError
+from src.exceptions.api_errors import APIError, DuplicateImageError, ServerBusyError
+from src.middleware.admission import AdmissionControlMiddleware
+from src.middleware.compression import JSONCompressionMiddleware
 
 
 logger = get_logger(__name__)
 
-app = FastAPI(title="Upload Server")
+HEALTH_PATHS = ("/", "/health/live", "/health/ready")
+
+app = FastAPI(title="Upload Server", lifespan=lifespan)
+
+app.add_middleware(JSONCompressionMiddleware)
+
+app.add_middleware(AdmissionControlMiddleware, exempt_paths=HEALTH_PATHS)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
 @app.exception_handler(APIError)
 async def api_error_handler(request: Request, exc: APIError):
     logger.error(f"{request.method} {request.url.path} → {exc.status_code}: {exc.message}")
+    retry_after = getattr(exc, "retry_after", None)
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.message}
+        content={"detail": exc.message},
+        headers={"Retry-After": str(retry_after)} if retry_after else None,
     )
 
 @app.get("/")
 async def root():
-    logger.info("Healthcheck hit")
     return {"message": "Welcome to the Upload Server"}
 
+@app.get("/health/live")
+async def liveness():
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness(request: Request):
+    if not request.app.state.warmed_up:
+        raise HTTPException(status_code=503, detail="Starting up")
+    if not request.app.state.partitions_ready:
+        raise HTTPException(status_code=503, detail="Image partitions are not ready")
+
+    from src.db.session import check_connection_pool
+
+    try:
+        await asyncio.to_thread(check_connection_pool, config.DB_READINESS_TIMEOUT)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {e}")
+
+    return {"status": "ready"}
+
 @app.get("/upload/")
 async def list_uploads(
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=20),
     order: str = Query("desc", regex="^(asc|desc)$"),
+    since: Optional[datetime] = Query(None, description="only uploads at or after this time"),
+    until: Optional[datetime] = Query(None, description="only uploads before this time"),
 ):
     repository = get_image_repository()
 
-    total = repository.count()
+    # A time window lets Postgres skip every monthly partition outside it.
+    total = repository.count(since, until)
     if total == 0:
         raise HTTPException(status_code=404, detail="No images found")
 
     limit = per_page
     offset = (page - 1) * per_page
 
-    images = repository.list_all(limit, offset, order)
+    images = repository.list_all(limit, offset, order, since, until)
 
     return {
         "items": [img.as_dict() for img in images],
@@ -68,8 +113,96 @@ async def list_uploads(
         },
     }
 
+@app.get("/upload/stats")
+async def get_upload_stats(days: int = Query(30, ge=1, le=366)):
+    repository = get_image_repository()
+
+    stats = repository.get_stats(days)
+
+    return {"days": days, **stats.as_dict()}
+
+@app.get("/upload/events")
+async def upload_events(last_event_id: Optional[str] = Header(None)):
+    if not config.EVENTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Event stream is disabled")
+
+    broker = get_event_broker()
+    if broker.subscriber_count >= config.EVENTS_MAX_SUBSCRIBERS:
+        raise ServerBusyError(retry_after=int(config.EVENTS_HEARTBEAT_INTERVAL), activity="event streams")
+
+    resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    subscription = broker.subscribe(resume_from)
+
+    async def stream():
+        deadline = time.monotonic() + config.EVENTS_MAX_STREAM_DURATION
+        try:
+            yield b"retry: 3000\n\n"
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    yield await asyncio.wait_for(
+                        subscription.get(), timeout=min(config.EVENTS_HEARTBEAT_INTERVAL, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+class _ReleasingStreamingResponse(StreamingResponse):
+    """Calls ``release`` once the response is finished, however it ends.
+
+    A generator's ``finally`` is not enough: a client that disconnects before
+    the first chunk means the body iterator is never started.
+    """
+
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+@app.get("/upload/export")
+async def export_uploads():
+    if not config.EXPORT_ENABLED:
+        raise HTTPException(status_code=404, detail="Export is disabled")
+
+    # Taken here on the event loop, so concurrent requests cannot all pass the check.
+    exporter = get_archive_exporter()
+    if not exporter.try_acquire():
+        raise ServerBusyError(retry_after=60, activity="exports")
+
+    chunks = exporter.stream()
+
+    async def stream():
+        try:
+            # Each chunk is produced in the thread pool, so the database cursor
+            # and file reads never block the event loop.
+            async for chunk in iterate_in_threadpool(chunks):
+                yield chunk
+        finally:
+            # On a client disconnect Starlette cancels the response; closing the
+            # iterator here releases the pooled connection and its snapshot.
+            chunks.close()
+
+    name = f"images-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.tar"
+    return _ReleasingStreamingResponse(
+        stream(),
+        exporter.release,
+        media_type="application/x-tar",
+        headers={"Content-Disposition": f'attachment; filename="{name}"', "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/upload/{filename}")
-async def get_upload_details(filename: str):
+async def get_upload_details(filename: str, request: Request):
     repository = get_image_repository()
 
     image = repository.get_by_filename(filename)
@@ -77,9 +210,47 @@ async def get_upload_details(filename: str):
         raise HTTPException(status_code=404, detail="Image not found")
 
     data = image.as_dict()
-    data["url"] = f"/images/{filename}"
+    for variant in data["variants"]:
+        variant["url"] = f"/images/{variant['filename']}"
+
+    variant = preferred_variant(request.headers.get("accept", ""), image.variants)
+    data["url"] = f"/images/{variant.filename if variant else filename}"
+    data["original_url"] = f"/images/{filename}"
     return data
 
+@app.get("/upload/{filename}/similar")
+async def get_similar_uploads(
+    filename: str,
+    max_distance: Optional[int] = Query(None, ge=0, le=64),
+    limit: int = Query(10, ge=1, le=50),
+):
+    if not config.SIMILARITY_INDEX_ENABLED:
+        raise HTTPException(status_code=404, detail="Similarity search is disabled")
+
+    repository = get_image_repository()
+
+    image = repository.get_by_filename(filename)
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+    if image.phash is None:
+        raise HTTPException(status_code=409, detail="Image has no perceptual hash")
+
+    if max_distance is None:
+        max_distance = config.SIMILARITY_MAX_DISTANCE
+
+    similar = await asyncio.to_thread(
+        get_similarity_service().find_similar, image.phash, max_distance, limit, image.id
+    )
+
+    return {
+        "filename": filename,
+        "max_distance": max_distance,
+        "items": [
+            {**match.as_dict(), "distance": distance, "url": f"/images/{match.filename}"}
+            for match, distance in similar
+        ],
+    }
+
 @app.post("/upload/")
 async def upload_file(file: UploadFile = File(...)):
     file_handler = get_file_handler()
@@ -90,14 +261,49 @@ async def upload_file(file: UploadFile = File(...)):
     except APIError as e:
         raise HTTPException(status_code=e.status_code, detail=e.message)
 
+    if config.IMAGE_NORMALIZE:
+        try:
+            uploaded = await asyncio.to_thread(get_image_normalizer().normalize, uploaded)
+        except Exception as e:
+            # The original is already stored and valid; serve it as uploaded.
+            logger.warning(f"Normalization of {uploaded.filename} failed: {e}")
+
+    phash = None
+    if config.SIMILARITY_INDEX_ENABLED:
+        similarity = get_similarity_service()
+        try:
+            phash = await asyncio.to_thread(similarity.hash_file, os.path.join(config.IMAGE_DIR, uploaded.filename))
+        except Exception as e:
+            logger.warning(f"Perceptual hash of {uploaded.filename} failed: {e}")
+
+        if phash is not None and config.REJECT_NEAR_DUPLICATES:
+            duplicate = await asyncio.to_thread(similarity.find_duplicate, phash, config.NEAR_DUPLICATE_DISTANCE)
+            if duplicate:
+                file_handler.delete_file(uploaded.filename)
+                existing, distance = duplicate
+                raise DuplicateImageError(existing.filename, distance)
+
     image_dto = ImageDTO(
         filename=uploaded.filename,
         original_filename=uploaded.original_filename,
         size=uploaded.size,
         file_type=uploaded.extension,
+        variants=[
+            ImageVariantDTO(
+                filename=v.filename,
+                file_type=v.extension,
+                size=v.size,
+                width=v.width,
+                height=v.height,
+            )
+            for v in uploaded.variants
+        ],
+        phash=phash,
     )
 
-    repository.create(image_dto)
+    created = repository.create(image_dto)
+    if phash is not None:
+        get_similarity_service().add(created.id, phash)
 
     logger.info(f"File uploaded: {uploaded.filename}")
 
@@ -107,6 +313,10 @@ async def upload_file(file: UploadFile = File(...)):
         "size": uploaded.size,
         "file_type": uploaded.extension,
         "url": uploaded.url,
+        "variants": [
+            {"filename": v.filename, "file_type": v.extension, "size": v.size, "url": v.url}
+            for v in uploaded.variants
+        ],
     }
 
 @app.delete("/upload/{filename}")
@@ -114,14 +324,15 @@ async def delete_upload(filename: str):
     file_handler = get_file_handler()
     repository = get_image_repository()
 
+    # The row is the source of truth: an unknown name is rejected by one index
+    # probe without touching the disk.
+    if not repository.delete_by_filename(filename):
+        raise HTTPException(status_code=404, detail="Image not found")
+
     try:
         file_handler.delete_file(filename)
     except APIError as e:
-        raise HTTPException(status_code=e.status_code, detail=e.message)
-
-    deleted = repository.delete_by_filename(filename)
-    if not deleted:
-        logger.warning(f"File '{filename}' not found in DB while deleting")
+        logger.warning(f"File '{filename}' deleted from DB but not from disk: {e.message}")
 
     logger.info(f"File deleted: {filename}")
 
@@ -0,0 +1,56 @@
+"""Export the image store to a tar archive, or import one.
+
+    python -m src.archive export backup.tar
+    python -m src.archive import backup.tar --workers 8
+    ssh old-host 'python -m src.archive export -' | python -m src.archive import -
+"""
+import argparse
+import sys
+
+from src.archive.export import ArchiveExporter
+from src.archive.importer import ArchiveImporter
+from src.db.dependencies import get_image_repository
+from src.db.session import close_connection_pool
+from src.settings.config import config
+
+
+def export_archive(path: str) -> None:
+    exporter = ArchiveExporter(get_image_repository())
+    with (open(path, "wb") if path != "-" else sys.stdout.buffer) as out:
+        for chunk in exporter.stream():
+            out.write(chunk)
+
+
+def import_archive(path: str, workers: int) -> None:
+    importer = ArchiveImporter(get_image_repository(), workers=workers)
+    with (open(path, "rb") if path != "-" else sys.stdin.buffer) as source:
+        result = importer.run(source)
+    print(
+        f"Imported {result.rows_imported} images in {result.batches} batches "
+        f"({result.rows_skipped} already present or invalid); "
+        f"{result.files_written} files written, {result.files_skipped} already present",
+        file=sys.stderr,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import the image store as a tar archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="write an archive of all images")
+    export_parser.add_argument("path", help="output file, '-' for stdout")
+    import_parser = commands.add_parser("import", help="load an archive; safe to re-run after a failure")
+    import_parser.add_argument("path", help="archive file (optionally gzip-compressed), '-' for stdin")
+    import_parser.add_argument("--workers", type=int, default=config.IMPORT_WORKERS, help="parallel file writers")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            export_archive(args.path)
+        else:
+            import_archive(args.path, args.workers)
+    finally:
+        close_connection_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.archive.export import ArchiveExporter
+
+_archive_exporter: Optional["ArchiveExporter"] = None
+
+def get_archive_exporter() -> "ArchiveExporter":
+    global _archive_exporter
+    if _archive_exporter is None:
+        from src.archive.export import ArchiveExporter
+        from src.db.dependencies import get_image_repository
+
+        _archive_exporter = ArchiveExporter(get_image_repository())
+    return _archive_exporter
@@ -0,0 +1,132 @@
+import json
+import os
+import tarfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Generator, Iterable, Iterator, List, Optional
+
+from src.interfaces.repositories import ImageRepository
+from src.settings.config import config
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+ARCHIVE_FORMAT = 1
+HEADER_NAME = "export.json"
+FILES_DIR = "images"
+MANIFEST_DIR = "manifest"
+
+BLOCK_SIZE = tarfile.BLOCKSIZE
+CHUNK_SIZE = 256 * 1024
+
+
+def _header(name: str, size: int, mtime: float) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(mtime)
+    info.mode = 0o644
+    return info.tobuf(tarfile.PAX_FORMAT)
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % BLOCK_SIZE)
+
+
+def _coalesce(pieces: Iterable[bytes], size: int) -> Iterator[bytes]:
+    buffer: List[bytes] = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+class ArchiveExporter:
+    """Streams the whole image store as an uncompressed tar.
+
+    Each batch of rows is followed by the files it references under
+    ``images/`` and then by its manifest ``manifest/NNNNNN.ndjson`` (one
+    image per line), so an importer can load a batch as soon as its files
+    are on disk. Rows come from a single database snapshot; a row whose
+    file has been deleted since is left out, and so is a missing variant.
+    Tar headers are written by hand so that no file is read into memory as
+    a whole.
+    """
+
+    def __init__(
+            self,
+            repository: ImageRepository,
+            images_dir: Optional[str] = None,
+            batch_size: Optional[int] = None,
+            max_concurrent: Optional[int] = None,
+    ):
+        self._repository = repository
+        self._images_dir = images_dir or config.IMAGE_DIR
+        self._batch_size = batch_size or config.EXPORT_BATCH_SIZE
+        self._slots = threading.BoundedSemaphore(max_concurrent or config.EXPORT_MAX_CONCURRENT)
+
+    def try_acquire(self) -> bool:
+        return self._slots.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._slots.release()
+
+    def stream(self) -> Iterator[bytes]:
+        yield from _coalesce(self._members(), CHUNK_SIZE)
+
+    def _members(self) -> Iterator[bytes]:
+        header = {"format": ARCHIVE_FORMAT, "exported_at": datetime.now(timezone.utc).isoformat()}
+        yield from self._bytes_member(HEADER_NAME, json.dumps(header).encode())
+
+        exported = 0
+        for number, batch in enumerate(self._repository.export_batches(self._batch_size), 1):
+            lines = []
+            for image in batch:
+                if not (yield from self._file_member(image.filename)):
+                    logger.warning(f"Export skips {image.filename}: file is missing")
+                    continue
+                variants = []
+                for variant in image.variants:
+                    if (yield from self._file_member(variant.filename)):
+                        variants.append(variant)
+                image.variants = variants
+                lines.append(json.dumps(image.as_dict(), separators=(",", ":")))
+            if lines:
+                yield from self._bytes_member(f"{MANIFEST_DIR}/{number:06d}.ndjson", ("\n".join(lines) + "\n").encode())
+            exported += len(lines)
+
+        yield b"\0" * (2 * BLOCK_SIZE)
+        logger.info(f"Exported {exported} images")
+
+    @staticmethod
+    def _bytes_member(name: str, data: bytes) -> Iterator[bytes]:
+        yield _header(name, len(data), time.time())
+        yield data
+        yield _padding(len(data))
+
+    def _file_member(self, filename: str) -> Generator[bytes, None, bool]:
+        try:
+            f = open(os.path.join(self._images_dir, filename), "rb")
+        except FileNotFoundError:
+            return False
+        with f:
+            stat = os.fstat(f.fileno())
+            yield _header(f"{FILES_DIR}/{filename}", stat.st_size, stat.st_mtime)
+            remaining = stat.st_size
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    # Truncated while being read; the header already promised st_size bytes.
+                    logger.warning(f"Export of {filename} ended {remaining} bytes early")
+                    yield b"\0" * remaining
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        yield _padding(stat.st_size)
+        return True
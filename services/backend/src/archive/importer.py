@@ -0,0 +1,155 @@
+import json
+import os
+import tarfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import BinaryIO, List, Optional
+
+from src.archive.export import ARCHIVE_FORMAT, FILES_DIR, HEADER_NAME, MANIFEST_DIR
+from src.db.dto import ImageDetailsDTO, ImageVariantDTO
+from src.db.keys import key_from_filename
+from src.exceptions.api_errors import ArchiveFormatError
+from src.interfaces.repositories import ImageRepository
+from src.settings.config import config
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ImportResult:
+    batches: int = 0
+    rows_imported: int = 0
+    rows_skipped: int = 0
+    files_written: int = 0
+    files_skipped: int = 0
+
+
+class ArchiveImporter:
+    """Loads an archive produced by ArchiveExporter.
+
+    Files are written by a thread pool while the tar is read sequentially
+    (from a file or a pipe). When a batch's manifest arrives, the importer
+    waits for the outstanding writes and only then loads the rows with COPY,
+    so a row is never committed before its files. Files that already exist
+    with the same size and rows that already exist are skipped, which makes
+    running the same import again after a failure resume where it stopped.
+    """
+
+    def __init__(
+            self,
+            repository: ImageRepository,
+            images_dir: Optional[str] = None,
+            workers: Optional[int] = None,
+            months_ahead: Optional[int] = None,
+    ):
+        self._repository = repository
+        self._images_dir = images_dir or config.IMAGE_DIR
+        self._workers = workers or config.IMPORT_WORKERS
+        self._months_ahead = config.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        self._allowed = set(config.SUPPORTED_FORMATS) | set(config.IMAGE_VARIANT_FORMATS)
+        self._partitions_from: Optional[date] = None
+
+    def run(self, fileobj: BinaryIO) -> ImportResult:
+        result = ImportResult()
+        os.makedirs(self._images_dir, exist_ok=True)
+        pending: List[Future] = []
+        header_seen = False
+
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive, ThreadPoolExecutor(self._workers) as pool:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                if member.name == HEADER_NAME:
+                    self._check_header(archive.extractfile(member).read())
+                    header_seen = True
+                elif not header_seen:
+                    raise ArchiveFormatError(f"'{HEADER_NAME}' must be the first member")
+                elif member.name.startswith(f"{FILES_DIR}/"):
+                    filename = self._safe_filename(member.name[len(FILES_DIR) + 1:])
+                    # Bounded so that a slow disk does not pull the whole archive into memory.
+                    if len(pending) >= self._workers * 2:
+                        self._collect(pending.pop(0), result)
+                    pending.append(pool.submit(self._write_file, filename, archive.extractfile(member).read()))
+                elif member.name.startswith(f"{MANIFEST_DIR}/"):
+                    while pending:
+                        self._collect(pending.pop(0), result)
+                    self._load_batch(archive.extractfile(member).read(), result)
+                else:
+                    logger.warning(f"Import ignores unexpected member {member.name}")
+
+            while pending:
+                self._collect(pending.pop(0), result)
+
+        if not header_seen:
+            raise ArchiveFormatError("no export header")
+        return result
+
+    @staticmethod
+    def _check_header(data: bytes) -> None:
+        header = json.loads(data)
+        if header.get("format") != ARCHIVE_FORMAT:
+            raise ArchiveFormatError(f"unsupported format {header.get('format')!r}")
+
+    def _safe_filename(self, filename: str) -> str:
+        if (
+                not filename
+                or filename != os.path.basename(filename)
+                or filename.startswith(".")
+                or os.path.splitext(filename)[1].lower() not in self._allowed
+        ):
+            raise ArchiveFormatError(f"refusing to write '{filename}'")
+        return filename
+
+    def _write_file(self, filename: str, data: bytes) -> bool:
+        path = os.path.join(self._images_dir, filename)
+        try:
+            if os.path.getsize(path) == len(data):
+                return False
+        except OSError:
+            pass
+
+        # Written under a temporary name so that a crash never leaves a
+        # truncated file under the final one.
+        partial = os.path.join(self._images_dir, f".{filename}.import")
+        with open(partial, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)
+        return True
+
+    @staticmethod
+    def _collect(future: Future, result: ImportResult) -> None:
+        if future.result():
+            result.files_written += 1
+        else:
+            result.files_skipped += 1
+
+    def _load_batch(self, data: bytes, result: ImportResult) -> None:
+        images = []
+        for line in data.decode("utf-8").splitlines():
+            if not line:
+                continue
+            row = json.loads(line)
+            row["variants"] = [ImageVariantDTO(**variant) for variant in row.get("variants", [])]
+            image = ImageDetailsDTO(**row)
+            if key_from_filename(image.filename) is None:
+                logger.warning(f"Import skips {image.filename}: the filename carries no key")
+                result.rows_skipped += 1
+                continue
+            images.append(image)
+
+        if not images:
+            return
+
+        oldest = min(datetime.fromisoformat(image.upload_time) for image in images).date()
+        if self._partitions_from is None or oldest < self._partitions_from:
+            self._repository.ensure_partitions(oldest, self._months_ahead)
+            self._partitions_from = oldest.replace(day=1)
+
+        imported = self._repository.import_images(images)
+        result.batches += 1
+        result.rows_imported += imported
+        result.rows_skipped += len(images) - imported
+        logger.info(f"Imported batch {result.batches}: {imported} of {len(images)} rows")
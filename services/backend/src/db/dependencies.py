@@ -1,15 +1,27 @@
 from typing import Optional
 
-from src.db.session import get_connection_pool
-from src.db.repositories import PostgresImageRepository
+from src.db.cache import TTLCache
+from src.db.dto import ImageDetailsDTO
 from src.interfaces.repositories import ImageRepository
+from src.settings.config import config
 
 
+_image_cache: Optional[TTLCache[ImageDetailsDTO]] = None
 _image_repository: Optional[ImageRepository] = None
 
+def get_image_cache() -> Optional[TTLCache[ImageDetailsDTO]]:
+    global _image_cache
+    if _image_cache is None and config.FILENAME_CACHE_SIZE > 0:
+        _image_cache = TTLCache(config.FILENAME_CACHE_SIZE, config.FILENAME_CACHE_TTL)
+    return _image_cache
+
 def get_image_repository() -> ImageRepository:
     global _image_repository
     if _image_repository is None:
+        # psycopg is imported here rather than at module level to keep `import src.app` fast.
+        from src.db.session import get_connection_pool
+        from src.db.repositories import PostgresImageRepository
+
         pool = get_connection_pool()
-        _image_repository = PostgresImageRepository(pool)
-    return _image_repository
\ No newline at end of file
+        _image_repository = PostgresImageRepository(pool, get_image_cache())
+    return _image_repository
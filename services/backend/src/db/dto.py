@@ -1,5 +1,16 @@
-from dataclasses import dataclass, asdict
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, List, Optional
+
+@dataclass
+class ImageVariantDTO:
+    filename: str
+    file_type: str
+    size: int
+    width: int
+    height: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
 @dataclass
 class ImageDTO:
@@ -7,6 +18,8 @@ class ImageDTO:
     original_filename: str
     size: int
     file_type: str
+    variants: List[ImageVariantDTO] = field(default_factory=list)
+    phash: Optional[int] = None
 
     def as_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -19,6 +32,51 @@ class ImageDetailsDTO:
     size: int
     file_type: str
     upload_time: Optional[str] = None  # upload_time може бути None
+    variants: List[ImageVariantDTO] = field(default_factory=list)
+    phash: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+@dataclass
+class DailyStatsDTO:
+    day: str
+    file_type: str
+    image_count: int
+    total_bytes: int
+    variant_bytes: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+@dataclass
+class TypeStatsDTO:
+    file_type: str
+    image_count: int
+    total_bytes: int
+    variant_bytes: int
 
     def as_dict(self) -> Dict[str, Any]:
         return asdict(self)
+
+@dataclass
+class ImageStatsDTO:
+    by_day: List[DailyStatsDTO] = field(default_factory=list)
+    by_type: List[TypeStatsDTO] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "totals": {
+                "image_count": sum(t.image_count for t in self.by_type),
+                "total_bytes": sum(t.total_bytes for t in self.by_type),
+                "variant_bytes": sum(t.variant_bytes for t in self.by_type),
+            },
+            "by_type": [t.as_dict() for t in self.by_type],
+            "by_day": [d.as_dict() for d in self.by_day],
+        }
+
+@dataclass
+class DroppedPartitionDTO:
+    image_count: int = 0
+    # Originals and variants, to be removed from disk.
+    filenames: List[str] = field(default_factory=list)
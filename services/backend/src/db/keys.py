@@ -0,0 +1,43 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+EPOCH = datetime(1970, 1, 1)
+KEY_LENGTH = 36
+
+
+def new_image_key() -> uuid.UUID:
+    return uuid.uuid7()
+
+
+def build_filename(prefix: str, key: uuid.UUID, extension: str) -> str:
+    return f"{prefix}_{key}{extension}"
+
+
+def key_from_filename(filename: str) -> Optional[uuid.UUID]:
+    """Returns the key of a ``<prefix>_<uuid><ext>`` filename, or None if it has none."""
+    stem = os.path.splitext(filename)[0]
+    if len(stem) <= KEY_LENGTH or stem[-KEY_LENGTH - 1] != "_":
+        return None
+    try:
+        return uuid.UUID(stem[-KEY_LENGTH:])
+    except ValueError:
+        return None
+
+
+def key_time(key: uuid.UUID) -> Optional[datetime]:
+    """upload_time (naive UTC, millisecond precision) encoded in a UUIDv7 key.
+
+    Rows are stored with exactly this upload_time, so the key alone locates
+    the monthly partition. Keys of other versions (uploads made before keys
+    were time-ordered) return None, and so do timestamps past year 9999,
+    which only a crafted filename can carry.
+    """
+    if key.version != 7:
+        return None
+    try:
+        return EPOCH + timedelta(milliseconds=key.int >> 80)
+    except OverflowError:
+        return None
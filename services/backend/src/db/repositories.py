@@ -1,39 +1,234 @@
-from typing import List, Optional
+import json
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterator, List, Optional, Tuple
+from psycopg import sql
 from psycopg_pool import ConnectionPool
 from psycopg.errors import Error as PsycopgError
 
-from src.interfaces.repositories import ImageRepository, ImageDTO, ImageDetailsDTO
+from src.interfaces.repositories import ImageRepository, ImageDTO, ImageDetailsDTO, ImageVariantDTO
+from src.db.cache import TTLCache
+from src.db.dto import DailyStatsDTO, DroppedPartitionDTO, ImageStatsDTO, TypeStatsDTO
+from src.db.keys import key_from_filename, key_time
+from src.events.listener import CHANNEL as EVENTS_CHANNEL, SEQUENCE as EVENTS_SEQUENCE
 from src.exceptions.repository_errors import EntityCreationError, EntityDeletionError, QueryExecutionError
 
 
+# image_stats_daily is maintained in the same transaction as every insert and
+# delete, so GET /upload/stats never has to scan images.
+ROLLUP_ADD_QUERY = """
+    INSERT INTO image_stats_daily (day, file_type, image_count, total_bytes, variant_bytes)
+    VALUES (%s::date, %s, 1, %s, %s)
+    ON CONFLICT (day, file_type) DO UPDATE SET
+        image_count = image_stats_daily.image_count + 1,
+        total_bytes = image_stats_daily.total_bytes + EXCLUDED.total_bytes,
+        variant_bytes = image_stats_daily.variant_bytes + EXCLUDED.variant_bytes
+"""
+
+# images has no foreign keys pointing at it (so whole partitions can be
+# dropped); variants are deleted explicitly in the same statement.
+DELETE_WITH_ROLLUP_QUERY = """
+    WITH deleted AS (
+        DELETE FROM images
+        WHERE {condition}
+        RETURNING id, filename, upload_time, size, file_type
+    ), deleted_variants AS (
+        DELETE FROM image_variants v
+        USING deleted d
+        WHERE v.image_id = d.id AND v.upload_time = d.upload_time
+        RETURNING v.image_id, v.size
+    ), variant_totals AS (
+        SELECT image_id, sum(size) AS variant_bytes
+        FROM deleted_variants
+        GROUP BY image_id
+    ), removed AS (
+        SELECT
+            d.upload_time::date AS day,
+            d.file_type,
+            count(*) AS image_count,
+            sum(d.size) AS total_bytes,
+            COALESCE(sum(t.variant_bytes), 0) AS variant_bytes
+        FROM deleted d
+        LEFT JOIN variant_totals t ON t.image_id = d.id
+        GROUP BY 1, 2
+    ), rollup AS (
+        UPDATE image_stats_daily s
+        SET image_count = s.image_count - r.image_count,
+            total_bytes = s.total_bytes - r.total_bytes,
+            variant_bytes = s.variant_bytes - r.variant_bytes
+        FROM removed r
+        WHERE s.day = r.day AND s.file_type = r.file_type
+    )
+    SELECT id, filename FROM deleted
+"""
+
+# Delivered to listeners only when the surrounding transaction commits.
+NOTIFY_QUERY = f"""
+    SELECT pg_notify(
+        '{EVENTS_CHANNEL}',
+        (jsonb_build_object('id', nextval('{EVENTS_SEQUENCE}'), 'type', %s::text) || %s::jsonb)::text
+    )
+"""
+
+# Variants are aggregated per row so that an export is a single ordered scan.
+EXPORT_QUERY = """
+    SELECT
+        i.id, i.filename, i.original_name, i.size, i.upload_time, i.file_type::text, i.phash,
+        COALESCE((
+            SELECT jsonb_agg(jsonb_build_object(
+                'filename', v.filename, 'file_type', v.file_type, 'size', v.size,
+                'width', v.width, 'height', v.height
+            ) ORDER BY v.file_type)
+            FROM image_variants v
+            WHERE v.image_id = i.id AND v.upload_time = i.upload_time
+        ), '[]'::jsonb)
+    FROM images i
+    ORDER BY i.upload_time, i.id
+"""
+
+IMPORT_COPY_QUERY = """
+    COPY image_import (key, filename, original_name, size, upload_time, file_type, phash, variants)
+    FROM STDIN
+"""
+
+# Rows whose (key, upload_time) already exists are skipped, so importing the
+# same archive again (for instance after a failure) only adds what is missing.
+IMPORT_QUERY = """
+    WITH inserted AS (
+        INSERT INTO images (key, filename, original_name, size, upload_time, file_type, phash)
+        SELECT key, filename, original_name, size, upload_time, file_type::file_extension, phash
+        FROM image_import
+        ON CONFLICT (key, upload_time) DO NOTHING
+        RETURNING id, key, upload_time, size, file_type
+    ), inserted_variants AS (
+        INSERT INTO image_variants (image_id, upload_time, filename, file_type, size, width, height)
+        SELECT i.id, i.upload_time, v.filename, v.file_type::file_extension, v.size, v.width, v.height
+        FROM inserted i
+        JOIN image_import s ON s.key = i.key AND s.upload_time = i.upload_time
+        CROSS JOIN LATERAL jsonb_to_recordset(s.variants)
+            AS v(filename TEXT, file_type TEXT, size INTEGER, width INTEGER, height INTEGER)
+        RETURNING image_id, size
+    ), variant_totals AS (
+        SELECT image_id, sum(size) AS variant_bytes
+        FROM inserted_variants
+        GROUP BY image_id
+    ), rollup AS (
+        INSERT INTO image_stats_daily (day, file_type, image_count, total_bytes, variant_bytes)
+        SELECT i.upload_time::date, i.file_type, count(*), sum(i.size), COALESCE(sum(t.variant_bytes), 0)
+        FROM inserted i
+        LEFT JOIN variant_totals t ON t.image_id = i.id
+        GROUP BY 1, 2
+        ON CONFLICT (day, file_type) DO UPDATE SET
+            image_count = image_stats_daily.image_count + EXCLUDED.image_count,
+            total_bytes = image_stats_daily.total_bytes + EXCLUDED.total_bytes,
+            variant_bytes = image_stats_daily.variant_bytes + EXCLUDED.variant_bytes
+    )
+    SELECT count(*) FROM inserted
+"""
+
+# Shared with ensure_image_partitions() in init-sql/create-tables.sql.
+PARTITION_LOCK_QUERY = "SELECT pg_advisory_xact_lock(hashtext('ensure_image_partitions'))"
+PARTITIONED_TABLES = ("images", "image_variants")
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    # upload_time is a plain TIMESTAMP; comparing it to a timestamptz parameter
+    # would defeat plan-time partition pruning.
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _filename_condition(filename: str) -> Optional[Tuple[str, List[Any]]]:
+    """WHERE clause locating ``filename`` through its key, or None if it cannot exist.
+
+    With a UUIDv7 key the upload_time is known too, which pins the lookup to
+    one partition's (key, upload_time) index. The filename is still compared
+    so that a different prefix or extension around a valid key does not match.
+    """
+    key = key_from_filename(filename)
+    if key is None:
+        return None
+    upload_time = key_time(key)
+    if upload_time is None:
+        if key.version == 7:
+            # Its timestamp is out of range, so no upload was ever stored under it.
+            return None
+        return "key = %s AND filename = %s", [key, filename]
+    return "key = %s AND upload_time = %s AND filename = %s", [key, upload_time, filename]
+
+
+def _time_range(since: Optional[datetime], until: Optional[datetime]) -> Tuple[str, List[Any]]:
+    conditions, params = [], []
+    if since is not None:
+        conditions.append("upload_time >= %s")
+        params.append(_as_naive_utc(since))
+    if until is not None:
+        conditions.append("upload_time < %s")
+        params.append(_as_naive_utc(until))
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
 class PostgresImageRepository(ImageRepository):
-    def __init__(self, pool: ConnectionPool):
+    def __init__(self, pool: ConnectionPool, cache: Optional[TTLCache[ImageDetailsDTO]] = None):
         self._pool = pool
+        self._cache = cache
 
     def create(self, image: ImageDTO) -> ImageDetailsDTO:
         query = """
-            INSERT INTO images (filename, original_name, size, file_type)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO images (key, filename, original_name, size, upload_time, file_type, phash)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
             RETURNING id, upload_time
         """
+        key = key_from_filename(image.filename)
+        if key is None:
+            raise EntityCreationError("Image", f"filename '{image.filename}' carries no key")
+        upload_time = key_time(key) or datetime.now(timezone.utc).replace(tzinfo=None)
         try:
             with self._pool.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         query,
-                        (image.filename, image.original_filename, image.size, image.file_type),
+                        (
+                            key,
+                            image.filename,
+                            image.original_filename,
+                            image.size,
+                            upload_time,
+                            image.file_type,
+                            image.phash,
+                        ),
                     )
                     db_id, upload_time = cur.fetchone()
-                    conn.commit()
+                    if image.variants:
+                        cur.executemany(
+                            """
+                            INSERT INTO image_variants (image_id, upload_time, filename, file_type, size, width, height)
+                            VALUES (%s, %s, %s, %s, %s, %s, %s)
+                            """,
+                            [
+                                (db_id, upload_time, v.filename, v.file_type, v.size, v.width, v.height)
+                                for v in image.variants
+                            ],
+                        )
+                    cur.execute(
+                        ROLLUP_ADD_QUERY,
+                        (upload_time, image.file_type, image.size, sum(v.size for v in image.variants)),
+                    )
 
-                    return ImageDetailsDTO(
+                    details = ImageDetailsDTO(
                         id=db_id,
                         filename=image.filename,
                         original_filename=image.original_filename,
                         size=image.size,
                         file_type=image.file_type,
                         upload_time=upload_time.isoformat() if upload_time else None,
+                        variants=list(image.variants),
+                        phash=image.phash,
                     )
+                    self._notify(cur, "created", {"image": details.as_dict()})
+                    conn.commit()
+
+                    return details
         except PsycopgError as e:
             raise EntityCreationError("Image", str(e))
 
@@ -63,67 +258,239 @@ class PostgresImageRepository(ImageRepository):
             raise QueryExecutionError("get_by_id", str(e))
 
     def get_by_filename(self, filename: str) -> Optional[ImageDetailsDTO]:
-        query = """
-            SELECT id, filename, original_name, size, upload_time, file_type::text
+        lookup = _filename_condition(filename)
+        if lookup is None:
+            return None
+        if self._cache is not None:
+            cached = self._cache.get(filename)
+            if cached is not None:
+                return cached
+
+        condition, params = lookup
+        query = f"""
+            SELECT id, filename, original_name, size, upload_time, file_type::text, phash
             FROM images
-            WHERE filename = %s
+            WHERE {condition}
         """
         try:
             with self._pool.connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query, (filename,))
+                    cur.execute(query, params)
                     result = cur.fetchone()
                     if not result:
                         return None
-                    db_id, filename, original_name, size, upload_time, file_type = result
-                    return ImageDetailsDTO(
+                    db_id, filename, original_name, size, upload_time, file_type, phash = result
+                    details = ImageDetailsDTO(
                         id=db_id,
                         filename=filename,
                         original_filename=original_name,
                         size=size,
                         upload_time=upload_time.isoformat() if upload_time else None,
                         file_type=file_type,
+                        variants=self._fetch_variants(cur, db_id, upload_time),
+                        phash=phash,
                     )
         except PsycopgError as e:
             raise QueryExecutionError("get_by_filename", str(e))
 
+        # Misses are not cached: the file may be uploaded in the next second.
+        if self._cache is not None:
+            self._cache.set(filename, details)
+        return details
+
+    def _evict(self, filename: str) -> None:
+        if self._cache is not None:
+            self._cache.pop(filename)
+
+    def _evict_all(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
+
+    @staticmethod
+    def _notify(cur, event_type: str, payload: dict) -> None:
+        cur.execute(NOTIFY_QUERY, (event_type, json.dumps(payload)))
+
+    @staticmethod
+    def _fetch_variants(cur, image_id: int, upload_time: datetime) -> List[ImageVariantDTO]:
+        cur.execute(
+            """
+            SELECT filename, file_type::text, size, width, height
+            FROM image_variants
+            WHERE image_id = %s AND upload_time = %s
+            """,
+            (image_id, upload_time),
+        )
+        return [
+            ImageVariantDTO(filename=row[0], file_type=row[1], size=row[2], width=row[3], height=row[4])
+            for row in cur.fetchall()
+        ]
+
+    def get_by_ids(self, image_ids: List[int]) -> List[ImageDetailsDTO]:
+        query = """
+            SELECT id, filename, original_name, size, upload_time, file_type::text, phash
+            FROM images
+            WHERE id = ANY(%s)
+        """
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, (list(image_ids),))
+                    return [
+                        ImageDetailsDTO(
+                            id=row[0],
+                            filename=row[1],
+                            original_filename=row[2],
+                            size=row[3],
+                            upload_time=row[4].isoformat() if row[4] else None,
+                            file_type=row[5],
+                            phash=row[6],
+                        )
+                        for row in cur.fetchall()
+                    ]
+        except PsycopgError as e:
+            raise QueryExecutionError("get_by_ids", str(e))
+
+    def list_hashes(self, after_id: int = 0, limit: int = 50_000) -> List[Tuple[int, int]]:
+        query = """
+            SELECT id, phash
+            FROM images
+            WHERE id > %s AND phash IS NOT NULL
+            ORDER BY id
+            LIMIT %s
+        """
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, (after_id, limit))
+                    return cur.fetchall()
+        except PsycopgError as e:
+            raise QueryExecutionError("list_hashes", str(e))
+
+    def export_batches(self, batch_size: int = 1000) -> Iterator[List[ImageDetailsDTO]]:
+        try:
+            with self._pool.connection() as conn:
+                try:
+                    # One snapshot for the whole export; the named cursor keeps
+                    # only the current batch in memory.
+                    conn.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                    with conn.cursor(name="image_export") as cur:
+                        cur.itersize = batch_size
+                        cur.execute(EXPORT_QUERY)
+                        while rows := cur.fetchmany(batch_size):
+                            yield [
+                                ImageDetailsDTO(
+                                    id=row[0],
+                                    filename=row[1],
+                                    original_filename=row[2],
+                                    size=row[3],
+                                    upload_time=row[4].isoformat(),
+                                    file_type=row[5],
+                                    phash=row[6],
+                                    variants=[ImageVariantDTO(**variant) for variant in row[7]],
+                                )
+                                for row in rows
+                            ]
+                finally:
+                    conn.rollback()
+        except PsycopgError as e:
+            raise QueryExecutionError("export_batches", str(e))
+
+    def import_images(self, images: List[ImageDetailsDTO]) -> int:
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        CREATE TEMP TABLE image_import (
+                            key UUID NOT NULL,
+                            filename TEXT NOT NULL,
+                            original_name TEXT NOT NULL,
+                            size INTEGER NOT NULL,
+                            upload_time TIMESTAMP NOT NULL,
+                            file_type TEXT NOT NULL,
+                            phash BIGINT,
+                            variants JSONB NOT NULL
+                        ) ON COMMIT DROP
+                        """
+                    )
+                    with cur.copy(IMPORT_COPY_QUERY) as copy:
+                        for image in images:
+                            copy.write_row((
+                                key_from_filename(image.filename),
+                                image.filename,
+                                image.original_filename,
+                                image.size,
+                                _as_naive_utc(datetime.fromisoformat(image.upload_time)),
+                                image.file_type,
+                                image.phash,
+                                json.dumps([v.as_dict() for v in image.variants]),
+                            ))
+                    cur.execute(IMPORT_QUERY)
+                    imported = cur.fetchone()[0]
+                    conn.commit()
+                    return imported
+        except PsycopgError as e:
+            raise EntityCreationError("Image", str(e))
+
     def delete(self, image_id: int) -> bool:
-        query = "DELETE FROM images WHERE id = %s RETURNING id"
+        query = DELETE_WITH_ROLLUP_QUERY.format(condition="id = %s")
         try:
             with self._pool.connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(query, (image_id,))
                     result = cur.fetchone()
+                    if result:
+                        self._notify(cur, "deleted", {"image_id": result[0], "filename": result[1]})
                     conn.commit()
-                    return result is not None
         except PsycopgError as e:
             raise EntityDeletionError("Image", image_id, str(e))
 
+        if result:
+            self._evict(result[1])
+        return result is not None
+
     def delete_by_filename(self, filename: str) -> bool:
-        query = "DELETE FROM images WHERE filename = %s RETURNING id"
+        lookup = _filename_condition(filename)
+        if lookup is None:
+            return False
+        condition, params = lookup
+        query = DELETE_WITH_ROLLUP_QUERY.format(condition=condition)
         try:
             with self._pool.connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query, (filename,))
+                    cur.execute(query, params)
                     result = cur.fetchone()
+                    if result:
+                        self._notify(cur, "deleted", {"image_id": result[0], "filename": result[1]})
                     conn.commit()
-                    return result is not None
         except PsycopgError as e:
             raise EntityDeletionError("Image", filename, str(e))
 
-    def list_all(self, limit: int = 10, offset: int = 0, order: str = "desc") -> List[ImageDetailsDTO]:
+        self._evict(filename)
+        return result is not None
+
+    def list_all(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        order: str = "desc",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[ImageDetailsDTO]:
         if order.lower() not in ("desc", "asc"):
             raise ValueError("Order parameter must be 'desc' or 'asc'")
+        where, params = _time_range(since, until)
         query = f"""
             SELECT id, filename, original_name, size, upload_time, file_type::text
             FROM images
+            {where}
             ORDER BY upload_time {order.upper()}
             LIMIT %s OFFSET %s
         """
         try:
             with self._pool.connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query, (limit, offset))
+                    cur.execute(query, (*params, limit, offset))
                     results = cur.fetchall()
                     return [
                         ImageDetailsDTO(
@@ -139,13 +506,129 @@ class PostgresImageRepository(ImageRepository):
         except PsycopgError as e:
             raise QueryExecutionError("list_all", str(e))
 
-    def count(self) -> int:
-        query = "SELECT COUNT(*) FROM images"
+    def count(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> int:
+        where, params = _time_range(since, until)
+        if where:
+            query = f"SELECT COUNT(*) FROM images {where}"
+        else:
+            # The rollup holds the same total without scanning every partition.
+            query = "SELECT COALESCE(sum(image_count), 0)::bigint FROM image_stats_daily"
         try:
             with self._pool.connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query)
+                    cur.execute(query, params)
                     result = cur.fetchone()
                     return result[0]
         except PsycopgError as e:
             raise QueryExecutionError("count", str(e))
+
+    def get_stats(self, days: int = 30) -> ImageStatsDTO:
+        daily_query = """
+            SELECT day, file_type::text, image_count, total_bytes, variant_bytes
+            FROM image_stats_daily
+            WHERE day > CURRENT_DATE - %s AND image_count > 0
+            ORDER BY day DESC, file_type
+        """
+        type_query = """
+            SELECT file_type::text, sum(image_count), sum(total_bytes), sum(variant_bytes)
+            FROM image_stats_daily
+            GROUP BY file_type
+            HAVING sum(image_count) > 0
+            ORDER BY file_type
+        """
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(daily_query, (days,))
+                    by_day = [
+                        DailyStatsDTO(
+                            day=row[0].isoformat(),
+                            file_type=row[1],
+                            image_count=row[2],
+                            total_bytes=row[3],
+                            variant_bytes=row[4],
+                        )
+                        for row in cur.fetchall()
+                    ]
+                    cur.execute(type_query)
+                    by_type = [
+                        TypeStatsDTO(
+                            file_type=row[0],
+                            image_count=int(row[1]),
+                            total_bytes=int(row[2]),
+                            variant_bytes=int(row[3]),
+                        )
+                        for row in cur.fetchall()
+                    ]
+                    return ImageStatsDTO(by_day=by_day, by_type=by_type)
+        except PsycopgError as e:
+            raise QueryExecutionError("get_stats", str(e))
+
+    def ensure_partitions(self, start_month: Optional[date] = None, months_ahead: int = 3) -> int:
+        query = "SELECT ensure_image_partitions(%s, %s)"
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, (start_month or date.today(), months_ahead))
+                    created = cur.fetchone()[0]
+                    conn.commit()
+                    return created
+        except PsycopgError as e:
+            raise QueryExecutionError("ensure_partitions", str(e))
+
+    def list_partition_months(self) -> List[date]:
+        query = """
+            SELECT c.relname::text
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'images'::regclass
+        """
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query)
+                    return sorted(
+                        datetime.strptime(name.removeprefix("images_p"), "%Y%m").date()
+                        for (name,) in cur.fetchall()
+                        if name.startswith("images_p")
+                    )
+        except PsycopgError as e:
+            raise QueryExecutionError("list_partition_months", str(e))
+
+    def drop_partition_month(self, month: date) -> DroppedPartitionDTO:
+        month = month.replace(day=1)
+        suffix = month.strftime("%Y%m")
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        try:
+            with self._pool.connection() as conn:
+                with conn.cursor() as cur:
+                    # Dropping a partition locks the parent table; give up rather
+                    # than queue every request behind a long-running query.
+                    cur.execute("SET LOCAL lock_timeout = '5s'")
+                    cur.execute(PARTITION_LOCK_QUERY)
+
+                    dropped = DroppedPartitionDTO()
+                    partitions = []
+                    for table in PARTITIONED_TABLES:
+                        cur.execute("SELECT to_regclass(%s)", (f"{table}_p{suffix}",))
+                        if cur.fetchone()[0] is None:
+                            continue
+                        partition = sql.Identifier(f"{table}_p{suffix}")
+                        cur.execute(sql.SQL("SELECT filename FROM {}").format(partition))
+                        filenames = [row[0] for row in cur.fetchall()]
+                        if table == "images":
+                            dropped.image_count = len(filenames)
+                        dropped.filenames.extend(filenames)
+                        partitions.append(partition)
+
+                    if partitions:
+                        cur.execute(sql.SQL("DROP TABLE {}").format(sql.SQL(", ").join(partitions)))
+                    cur.execute(
+                        "DELETE FROM image_stats_daily WHERE day >= %s AND day < %s",
+                        (month, next_month),
+                    )
+                    conn.commit()
+                    self._evict_all()
+                    return dropped
+        except PsycopgError as e:
+            raise EntityDeletionError("Partition", suffix, str(e))
@@ -1,5 +1,6 @@
+import time
 from typing import Optional
-from psycopg_pool import ConnectionPool
+from psycopg_pool import ConnectionPool, PoolTimeout
 from src.settings.config import config
 
 _pool: Optional[ConnectionPool] = None
@@ -9,8 +10,29 @@ def get_connection_pool() -> ConnectionPool:
     if _pool is None:
         _pool = ConnectionPool(
         conninfo = config.db_url,
-        min_size = 2,
-        max_size = 10,
+        min_size = config.DB_POOL_MIN_SIZE,
+        max_size = config.DB_POOL_MAX_SIZE,
         open=True
         )
-    return _pool
\ No newline at end of file
+    return _pool
+
+def warm_up_connection_pool(timeout: float) -> None:
+    # Same condition as ConnectionPool.wait(), which closes the pool on timeout.
+    # Repositories keep a reference to this pool, so it has to stay open and
+    # keep reconnecting in the background instead.
+    pool = get_connection_pool()
+    deadline = time.monotonic() + timeout
+    while pool.get_stats()["pool_available"] < pool.min_size:
+        if time.monotonic() >= deadline:
+            raise PoolTimeout(f"pool initialization incomplete after {timeout} sec")
+        time.sleep(0.05)
+
+def check_connection_pool(timeout: float) -> None:
+    with get_connection_pool().connection(timeout=timeout) as conn:
+        conn.execute("SELECT 1")
+
+def close_connection_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
@@ -1,7 +1,16 @@
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import List
 import datetime
 
+@dataclass
+class UploadedVariantDTO:
+    filename: str
+    extension: str
+    size: int
+    width: int
+    height: int
+    url: str
+
 @dataclass
 class UploadedFileDTO:
     filename: str
@@ -10,6 +19,7 @@ class UploadedFileDTO:
     extension: str
     url: str
     upload_time: datetime.datetime = field(default_factory=datetime.datetime.now)
+    variants: List[UploadedVariantDTO] = field(default_factory=list)
 
     def as_dict(self) -> dict:
         return {
@@ -18,5 +28,9 @@ class UploadedFileDTO:
             "size": self.size,
             "extension": self.extension,
             "url": self.url,
-            "upload_time": self.upload_time.isoformat()
+            "upload_time": self.upload_time.isoformat(),
+            "variants": [
+                {"filename": v.filename, "extension": v.extension, "size": v.size, "url": v.url}
+                for v in self.variants
+            ],
         }
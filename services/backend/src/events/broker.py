@@ -0,0 +1,120 @@
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from src.settings.config import config
+
+
+@dataclass(frozen=True)
+class ImageEvent:
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "ImageEvent":
+        data = json.loads(payload)
+        return cls(id=int(data["id"]), type=data["type"], data=data)
+
+    def encode(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, separators=(',', ':'))}\n\n".encode()
+
+
+# Tells the client its view can no longer be patched and must be refetched.
+RESET_EVENT = b"event: reset\ndata: {}\n\n"
+
+
+class Subscription:
+    """Bounded per-client buffer. A client that falls more than ``maxsize``
+    events behind loses its buffer and gets a single reset instead, so one
+    slow connection never holds memory or delays everyone else."""
+
+    def __init__(self, maxsize: int):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, message: bytes) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.reset()
+
+    def reset(self) -> None:
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(RESET_EVENT)
+
+    async def get(self) -> bytes:
+        return await self._queue.get()
+
+
+class EventBroker:
+    """Fans the events received by this worker's LISTEN connection out to its SSE clients.
+
+    Event ids come from a database sequence, so they are shared by all
+    workers and a client can resume on any of them. Ids are taken before
+    commit while notifications arrive in commit order, so a smaller id can
+    arrive after a larger one; replay therefore goes by arrival position. The
+    last EVENTS_HISTORY_SIZE events are kept, and a client whose last id is
+    not among them (evicted, or seen before this worker's listener
+    connected) gets a reset instead of a partial replay.
+    """
+
+    def __init__(self, history_size: Optional[int] = None, queue_size: Optional[int] = None):
+        self._history: Deque[ImageEvent] = deque(maxlen=history_size or config.EVENTS_HISTORY_SIZE)
+        self._queue_size = queue_size or config.EVENTS_QUEUE_SIZE
+        self._subscribers: Set[Subscription] = set()
+        self._connected = False
+        self._handlers: List[Callable[[ImageEvent], None]] = []
+        self._reset_handlers: List[Callable[[], None]] = []
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def add_handler(
+        self, on_event: Callable[[ImageEvent], None], on_reset: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Registers an in-process consumer; ``on_reset`` runs whenever events may have been missed."""
+        self._handlers.append(on_event)
+        if on_reset is not None:
+            self._reset_handlers.append(on_reset)
+
+    def publish(self, event: ImageEvent) -> None:
+        for handler in self._handlers:
+            handler(event)
+
+        self._history.append(event)
+
+        message = event.encode()
+        for subscription in self._subscribers:
+            subscription.offer(message)
+
+    def restart(self) -> None:
+        """Called whenever the listener (re)connects; anything before it may have been missed."""
+        reconnected = self._connected
+        self._history.clear()
+        self._connected = True
+        for handler in self._reset_handlers:
+            handler()
+        if reconnected:
+            for subscription in self._subscribers:
+                subscription.reset()
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self._queue_size)
+        if last_event_id is not None:
+            for message in self._replay(last_event_id):
+                subscription.offer(message)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def _replay(self, last_event_id: int) -> List[bytes]:
+        for position, event in enumerate(self._history):
+            if event.id == last_event_id:
+                return [later.encode() for later in list(self._history)[position + 1:]]
+        return [RESET_EVENT]
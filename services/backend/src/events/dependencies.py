@@ -0,0 +1,11 @@
+from typing import Optional
+
+from src.events.broker import EventBroker
+
+_event_broker: Optional[EventBroker] = None
+
+def get_event_broker() -> EventBroker:
+    global _event_broker
+    if _event_broker is None:
+        _event_broker = EventBroker()
+    return _event_broker
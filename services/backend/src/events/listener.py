@@ -0,0 +1,46 @@
+import asyncio
+from typing import Optional
+
+from src.events.broker import EventBroker, ImageEvent
+from src.settings.config import config
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+CHANNEL = "image_events"
+SEQUENCE = "image_events_seq"
+MAX_RECONNECT_DELAY = 30.0
+
+
+async def listen(broker: EventBroker, conninfo: Optional[str] = None) -> None:
+    """Keeps one LISTEN connection per worker and feeds its notifications to ``broker``.
+
+    LISTEN needs a session of its own, so this always connects to Postgres
+    directly: behind PgBouncer in transaction mode the registration would be
+    lost as soon as the server connection is handed to another client.
+    """
+    import psycopg
+
+    delay = config.EVENTS_RECONNECT_DELAY
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(
+                conninfo or config.database_url, autocommit=True
+            ) as conn:
+                await conn.execute(f"LISTEN {CHANNEL}")
+                # Only notifications committed from here on will arrive.
+                broker.restart()
+                delay = config.EVENTS_RECONNECT_DELAY
+
+                async for notify in conn.notifies():
+                    try:
+                        broker.publish(ImageEvent.from_payload(notify.payload))
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"Ignoring malformed {CHANNEL} payload: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Event listener disconnected: {e}; retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
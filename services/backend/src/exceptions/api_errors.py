@@ -29,6 +29,15 @@ class MultipleFilesUploadError(APIError):
 
 
 
+class DuplicateImageError(APIError):
+    status_code = 409
+
+    def __init__(self, filename: str, distance: int):
+        self.filename = filename
+        message = f"A near-identical image is already stored as '{filename}' (distance {distance})."
+        super().__init__(message)
+
+
 class FileNotFoundError(APIError):
     status_code = 404
 
@@ -59,4 +68,26 @@ class UnsupportedFileFormatError(APIError):
             message = f"Unsupported file format. Supported formats: {formats_list}."
         else:
             message = "Unsupported file format."
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+class TooManyRequestsError(APIError):
+    status_code = 429
+
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        message = f"Too many requests. Retry in {retry_after} s."
+        super().__init__(message)
+
+
+class ServerBusyError(APIError):
+    status_code = 503
+
+    def __init__(self, retry_after: int, activity: str = "uploads"):
+        self.retry_after = retry_after
+        message = f"Too many {activity} in progress. Retry in {retry_after} s."
+        super().__init__(message)
+
+
+class ArchiveFormatError(APIError):
+    def __init__(self, reason: str):
+        super().__init__(f"Invalid image archive: {reason}")
@@ -1,10 +1,12 @@
 from typing import Optional
 
 from src.handlers.files import FileHandler
-from src.interfaces.handlers import FileHandlerInterface
+from src.handlers.images import ImageNormalizer
+from src.interfaces.handlers import FileHandlerInterface, ImageNormalizerInterface
 from src.settings.config import config
 
 _file_handler: Optional[FileHandlerInterface] = None
+_image_normalizer: Optional[ImageNormalizerInterface] = None
 
 def get_file_handler() -> FileHandlerInterface:
     global _file_handler
@@ -12,6 +14,17 @@ def get_file_handler() -> FileHandlerInterface:
         _file_handler = FileHandler(
             images_dir = config.IMAGE_DIR,
             max_file_size = config.MAX_FILE_SIZE,
-            supported_formats = config.SUPPORTED_FORMATS
+            supported_formats = config.SUPPORTED_FORMATS,
+            variant_formats = config.IMAGE_VARIANT_FORMATS
         )
-    return _file_handler
\ No newline at end of file
+    return _file_handler
+
+def get_image_normalizer() -> ImageNormalizerInterface:
+    global _image_normalizer
+    if _image_normalizer is None:
+        _image_normalizer = ImageNormalizer(
+            images_dir = config.IMAGE_DIR,
+            max_dimension = config.IMAGE_MAX_DIMENSION,
+            variant_formats = config.IMAGE_VARIANT_FORMATS
+        )
+    return _image_normalizer
@@ -1,10 +1,8 @@
 import os
-import uuid
 import shutil
-from typing import cast, List, Callable, Any
-
-from PIL import Image, UnidentifiedImageError
+from typing import cast, Iterable, List, Callable, Any, Optional
 
+from src.db.keys import build_filename, new_image_key
 from src.dto.file import UploadedFileDTO
 from src.settings.config import config
 from src.exceptions.api_errors import (
@@ -18,18 +16,43 @@ from src.exceptions.api_errors import (
 )
 from src.interfaces.protocols import SupportsWrite
 from src.interfaces.handlers import FileHandlerInterface
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+PIL_FORMATS = {
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+    ".png": "PNG",
+    ".gif": "GIF",
+    ".webp": "WEBP",
+    ".avif": "AVIF",
+}
+
+
+def warm_up_pillow() -> None:
+    # Pillow is imported on first use; calling this at startup loads the core
+    # plugins off the request path.
+    from PIL import Image
+    Image.preinit()
 
 
 class FileHandler(FileHandlerInterface):
     def __init__(
             self,
-            images_dir: str = config.IMAGE_DIR,
-            max_file_size: int = config.MAX_FILE_SIZE,
-            supported_formats: set[str] = config.SUPPORTED_FORMATS
+            images_dir: Optional[str] = None,
+            max_file_size: Optional[int] = None,
+            supported_formats: Optional[set[str]] = None,
+            variant_formats: Optional[List[str]] = None
     ):
-        self._images_dir = images_dir
-        self._max_file_size = max_file_size
-        self._supported_formats = supported_formats
+        self._images_dir = images_dir or config.IMAGE_DIR
+        self._max_file_size = max_file_size or config.MAX_FILE_SIZE
+        self._supported_formats = supported_formats or config.SUPPORTED_FORMATS
+        self._variant_formats = variant_formats if variant_formats is not None else config.IMAGE_VARIANT_FORMATS
+        # Only probe the plugins for formats we accept instead of every registered one.
+        self._pil_formats = sorted({PIL_FORMATS[ext] for ext in self._supported_formats if ext in PIL_FORMATS})
 
     def handle_upload(self, file) -> UploadedFileDTO:
         filename = file.filename if hasattr(file, "filename") else "uploaded_file"
@@ -45,8 +68,10 @@ class FileHandler(FileHandlerInterface):
         if size > self._max_file_size:
             raise MaxSizeExceedError(self._max_file_size)
 
+        from PIL import Image, UnidentifiedImageError
+
         try:
-            image = Image.open(file.file)
+            image = Image.open(file.file, formats=self._pil_formats or None)
             image.verify()
             file.file.seek(0)
         except (UnidentifiedImageError, OSError):
@@ -54,7 +79,7 @@ class FileHandler(FileHandlerInterface):
 
         original_name = os.path.splitext(filename)[0].lower()
         original_name = ''.join(c for c in original_name if c.isalnum() or c in '_-')[:50]
-        unique_name = f"{original_name}_{uuid.uuid4()}{ext}"
+        unique_name = build_filename(original_name, new_image_key(), ext)
         os.makedirs(self._images_dir, exist_ok=True)
         file_path = os.path.join(self._images_dir, unique_name)
 
@@ -94,3 +119,31 @@ class FileHandler(FileHandlerInterface):
             raise PermissionDeniedError("delete file")
         except Exception as e:
             raise APIError(f"Failed to delete file: {str(e)}")
+
+        self._delete_variants(filename)
+
+    def _delete_variants(self, filename: str) -> None:
+        stem, ext = os.path.splitext(filename)
+        for variant_ext in self._variant_formats:
+            if variant_ext == ext.lower():
+                continue
+            variant_path = os.path.join(self._images_dir, f"{stem}{variant_ext}")
+            if not os.path.exists(variant_path):
+                continue
+            try:
+                os.remove(variant_path)
+            except OSError as e:
+                logger.warning(f"Failed to delete variant {stem}{variant_ext}: {e}")
+
+    def delete_files(self, filenames: Iterable[str]) -> int:
+        """Removes files in bulk, skipping ones that are already gone. Returns how many were removed."""
+        removed = 0
+        for filename in filenames:
+            filepath = os.path.join(self._images_dir, os.path.basename(filename))
+            try:
+                os.remove(filepath)
+                removed += 1
+            except OSError as e:
+                if os.path.exists(filepath):
+                    logger.warning(f"Failed to delete {filename}: {e}")
+        return removed
@@ -0,0 +1,170 @@
+import os
+from typing import List, Optional, Tuple
+
+from src.dto.file import UploadedFileDTO, UploadedVariantDTO
+from src.interfaces.handlers import ImageNormalizerInterface
+from src.settings.config import config
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+PIL_SAVE_FORMATS = {
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+    ".png": "PNG",
+    ".webp": "WEBP",
+    ".avif": "AVIF",
+}
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment", "photoshop")
+
+
+class ImageNormalizer(ImageNormalizerInterface):
+    """Post-upload stage: apply EXIF orientation, drop metadata, cap the size and
+    write smaller modern-format variants next to the original.
+
+    Animated images are left as uploaded.
+    """
+
+    def __init__(
+            self,
+            images_dir: Optional[str] = None,
+            max_dimension: Optional[int] = None,
+            variant_formats: Optional[List[str]] = None,
+    ):
+        self._images_dir = images_dir or config.IMAGE_DIR
+        self._max_dimension = max_dimension or config.IMAGE_MAX_DIMENSION
+        self._variant_formats = variant_formats if variant_formats is not None else config.IMAGE_VARIANT_FORMATS
+
+    def normalize(self, uploaded: UploadedFileDTO) -> UploadedFileDTO:
+        from PIL import Image, ImageOps
+
+        path = os.path.join(self._images_dir, uploaded.filename)
+
+        with Image.open(path) as source:
+            if getattr(source, "is_animated", False):
+                return uploaded
+
+            has_metadata = any(key in source.info for key in METADATA_KEYS) or len(source.getexif()) > 0
+            image = ImageOps.exif_transpose(source)
+            oversized = max(image.size) > self._max_dimension
+            if oversized:
+                image.thumbnail((self._max_dimension, self._max_dimension), Image.Resampling.LANCZOS)
+
+            icc_profile = source.info.get("icc_profile")
+
+            if (has_metadata or oversized) and uploaded.extension in PIL_SAVE_FORMATS:
+                uploaded.size = self._save(image, path, uploaded.extension, icc_profile)
+
+            for variant_ext in self._variant_formats:
+                if variant_ext == uploaded.extension:
+                    continue
+                variant = self._make_variant(image, uploaded, variant_ext, icc_profile)
+                if variant:
+                    uploaded.variants.append(variant)
+
+        return uploaded
+
+    def _make_variant(self, image, uploaded: UploadedFileDTO, ext: str, icc_profile) -> Optional[UploadedVariantDTO]:
+        from PIL import features
+
+        if not features.check(PIL_SAVE_FORMATS[ext].lower()):
+            return None
+
+        stem = os.path.splitext(uploaded.filename)[0]
+        filename = f"{stem}{ext}"
+        path = os.path.join(self._images_dir, filename)
+
+        try:
+            size = self._save(image, path, ext, icc_profile)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to encode {ext} variant of {uploaded.filename}: {e}")
+            return None
+
+        # A variant that is not smaller than the original only costs disk space.
+        if size >= uploaded.size:
+            os.remove(path)
+            return None
+
+        width, height = image.size
+        return UploadedVariantDTO(
+            filename=filename,
+            extension=ext,
+            size=size,
+            width=width,
+            height=height,
+            url=f"/images/{filename}",
+        )
+
+    @staticmethod
+    def _save(image, path: str, ext: str, icc_profile) -> int:
+        image, options = _encoder_options(image, PIL_SAVE_FORMATS[ext])
+        if icc_profile:
+            options["icc_profile"] = icc_profile
+
+        # Write next to the target and swap in, so readers never see a partial file.
+        tmp_path = f"{path}.tmp"
+        try:
+            image.save(tmp_path, format=PIL_SAVE_FORMATS[ext], **options)
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Nothing else knows about the .tmp name, so it would never be deleted.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        return os.path.getsize(path)
+
+
+def _encoder_options(image, pil_format: str) -> Tuple[object, dict]:
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+
+    if pil_format == "JPEG":
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        return image, {"quality": config.JPEG_QUALITY, "optimize": True, "progressive": True}
+
+    if pil_format == "PNG":
+        return image, {"optimize": True}
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    if pil_format == "WEBP":
+        return image, {"quality": config.WEBP_QUALITY, "method": 4}
+
+    return image, {"quality": config.AVIF_QUALITY, "speed": 6}
+
+
+VARIANT_MIME_TYPES = {
+    ".avif": "image/avif",
+    ".webp": "image/webp",
+}
+
+
+def accepted_mime_types(accept: str) -> set[str]:
+    accepted = set()
+    for part in accept.split(","):
+        mime, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(mime.strip().lower())
+    return accepted
+
+
+def preferred_variant(accept: str, variants: list, preference: Optional[List[str]] = None):
+    """Pick the first variant, in IMAGE_VARIANT_FORMATS order, the client accepts."""
+    accepted = accepted_mime_types(accept)
+    by_type = {variant.file_type: variant for variant in variants}
+    for ext in preference if preference is not None else config.IMAGE_VARIANT_FORMATS:
+        if ext in by_type and VARIANT_MIME_TYPES.get(ext) in accepted:
+            return by_type[ext]
+    return None
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Callable, Any
+from typing import Iterable, List, Callable, Any
 
 from src.dto.file import UploadedFileDTO
 
@@ -16,4 +16,14 @@ class FileHandlerInterface(ABC):
 
     @abstractmethod
     def delete_file(self, filename: str) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def delete_files(self, filenames: Iterable[str]) -> int:
+        pass
+
+class ImageNormalizerInterface(ABC):
+
+    @abstractmethod
+    def normalize(self, uploaded: UploadedFileDTO) -> UploadedFileDTO:
+        pass
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+
+
+class RateLimitStore(ABC):
+    # True when consume() may wait on I/O or locks; callers on the event loop
+    # then run it in a thread.
+    blocking: bool = False
+
+    @abstractmethod
+    def consume(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens from the bucket ``key``.
+
+        Returns 0 when the request is admitted, otherwise the number of seconds
+        until enough tokens will have been refilled.
+        """
+        pass
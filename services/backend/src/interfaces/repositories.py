@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Tuple
 
-from src.db.dto import ImageDTO, ImageDetailsDTO
+from src.db.dto import DroppedPartitionDTO, ImageDTO, ImageDetailsDTO, ImageVariantDTO, ImageStatsDTO
 
 
 class ImageRepository(ABC):
@@ -18,6 +19,24 @@ class ImageRepository(ABC):
     def get_by_filename(self, filename: str) -> Optional[ImageDetailsDTO]:
         pass
 
+    @abstractmethod
+    def get_by_ids(self, image_ids: List[int]) -> List[ImageDetailsDTO]:
+        pass
+
+    @abstractmethod
+    def list_hashes(self, after_id: int = 0, limit: int = 50_000) -> List[Tuple[int, int]]:
+        pass
+
+    @abstractmethod
+    def export_batches(self, batch_size: int = 1000) -> Iterator[List[ImageDetailsDTO]]:
+        """Yields every image, oldest first, from one consistent snapshot."""
+        pass
+
+    @abstractmethod
+    def import_images(self, images: List[ImageDetailsDTO]) -> int:
+        """Inserts images that are not stored yet and returns how many were inserted."""
+        pass
+
     @abstractmethod
     def delete(self, image_id: int) -> bool:
         pass
@@ -27,9 +46,33 @@ class ImageRepository(ABC):
         pass
 
     @abstractmethod
-    def list_all(self, limit: int = 10, offset: int = 0, order: str = "desc") -> List[ImageDetailsDTO]:
+    def list_all(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        order: str = "desc",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[ImageDetailsDTO]:
+        pass
+
+    @abstractmethod
+    def count(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> int:
+        pass
+
+    @abstractmethod
+    def get_stats(self, days: int = 30) -> ImageStatsDTO:
+        pass
+
+    @abstractmethod
+    def ensure_partitions(self, start_month: Optional[date] = None, months_ahead: int = 3) -> int:
+        pass
+
+    @abstractmethod
+    def list_partition_months(self) -> List[date]:
         pass
 
     @abstractmethod
-    def count(self) -> int:
+    def drop_partition_month(self, month: date) -> DroppedPartitionDTO:
+        """Drops every image uploaded in ``month``; returns how many and the filenames to remove from disk."""
         pass
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from src.handlers.files import warm_up_pillow
+from src.settings.config import config
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def _warm_up_database() -> None:
+    from src.db.session import warm_up_connection_pool
+    warm_up_connection_pool(config.DB_WARMUP_TIMEOUT)
+
+
+def _ensure_partitions() -> None:
+    from src.partitions.dependencies import get_partition_service
+    get_partition_service().ensure_partitions()
+
+
+def _maintain_partitions() -> None:
+    from src.partitions.dependencies import get_partition_service
+    get_partition_service().run()
+
+
+def _build_similarity_index() -> None:
+    from src.similarity.dependencies import get_similarity_service
+    get_similarity_service().refresh()
+
+
+def _rebuild_similarity_index() -> None:
+    from src.similarity.dependencies import get_similarity_service
+    get_similarity_service().rebuild()
+
+
+async def _listen_for_events() -> None:
+    from src.events.dependencies import get_event_broker
+    from src.events.listener import listen
+    from src.db.dependencies import get_image_cache
+    broker = get_event_broker()
+    cache = get_image_cache()
+    # A delete on another worker reaches this one's filename cache through the
+    # same notifications the SSE clients get.
+    if cache is not None:
+        def evict_deleted(event) -> None:
+            if event.type == "deleted":
+                cache.pop(event.data["filename"])
+
+        broker.add_handler(evict_deleted, on_reset=cache.clear)
+    await listen(broker)
+
+
+def _close_database() -> None:
+    from src.db.session import close_connection_pool
+    close_connection_pool()
+
+
+async def _warm_up(app: FastAPI) -> None:
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        asyncio.to_thread(_warm_up_database),
+        asyncio.to_thread(warm_up_pillow),
+        return_exceptions=True,
+    )
+    for name, result in zip(("database pool", "Pillow"), results):
+        if isinstance(result, Exception):
+            logger.error(f"Warm-up of {name} failed: {result}")
+    app.state.warmed_up = True
+    logger.info(f"Worker warm-up finished in {time.perf_counter() - started:.2f}s")
+
+    # Uploads fail if the current month has no partition, so this is part of
+    # readiness. A database that was down during warm-up is retried here.
+    while True:
+        try:
+            await asyncio.to_thread(_ensure_partitions)
+            break
+        except Exception as e:
+            logger.error(f"Creating image partitions failed: {e}")
+            await asyncio.sleep(config.PARTITION_RETRY_INTERVAL)
+    app.state.partitions_ready = True
+
+    loops = [_run_partition_maintenance()]
+    if config.SIMILARITY_INDEX_ENABLED:
+        loops.append(_run_similarity_maintenance())
+    await asyncio.gather(*loops)
+
+
+async def _run_partition_maintenance() -> None:
+    # Every worker runs this; partition DDL is serialised by an advisory lock
+    # and a month that another worker already dropped is simply gone.
+    while config.PARTITION_MAINTENANCE_INTERVAL > 0:
+        try:
+            await asyncio.to_thread(_maintain_partitions)
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(config.PARTITION_MAINTENANCE_INTERVAL)
+
+
+async def _run_similarity_maintenance() -> None:
+    # Readiness does not wait for the index; lookups before it is built load it themselves.
+    try:
+        await asyncio.to_thread(_build_similarity_index)
+    except Exception as e:
+        logger.error(f"Building the similarity index failed: {e}")
+
+    # The full reload that sheds deleted rows; lookups only ever top up.
+    while config.SIMILARITY_REBUILD_INTERVAL > 0:
+        await asyncio.sleep(config.SIMILARITY_REBUILD_INTERVAL)
+        try:
+            await asyncio.to_thread(_rebuild_similarity_index)
+        except Exception as e:
+            logger.error(f"Rebuilding the similarity index failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start serving liveness probes right away; the pool and Pillow warm up in
+    # background threads and readiness reports 503 until they are done.
+    app.state.warmed_up = False
+    app.state.partitions_ready = False
+    warm_up = asyncio.create_task(_warm_up(app))
+    listener = asyncio.create_task(_listen_for_events()) if config.EVENTS_ENABLED else None
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        if listener:
+            listener.cancel()
+        await asyncio.to_thread(_close_database)
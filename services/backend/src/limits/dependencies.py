@@ -0,0 +1,16 @@
+from typing import Optional
+
+from src.interfaces.limits import RateLimitStore
+from src.limits.stores import InMemoryRateLimitStore, SQLiteRateLimitStore
+from src.settings.config import config
+
+_rate_limit_store: Optional[RateLimitStore] = None
+
+def get_rate_limit_store() -> RateLimitStore:
+    global _rate_limit_store
+    if _rate_limit_store is None:
+        if config.RATE_LIMIT_SHARED_STORE:
+            _rate_limit_store = SQLiteRateLimitStore(config.RATE_LIMIT_DB_PATH)
+        else:
+            _rate_limit_store = InMemoryRateLimitStore()
+    return _rate_limit_store
@@ -0,0 +1,114 @@
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+from src.interfaces.limits import RateLimitStore
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: int) -> float:
+    return min(float(burst), tokens + max(0.0, now - updated) * rate)
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    CLEANUP_EVERY = 1000
+
+    def __init__(self, idle_ttl: float = 3600.0):
+        self._idle_ttl = idle_ttl
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def consume(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_cleanup(now)
+            tokens, updated = self._buckets.get(key, (float(burst), now))
+            tokens = _refill(tokens, updated, now, rate, burst)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (cost - tokens) / rate
+
+    def _maybe_cleanup(self, now: float) -> None:
+        # Without this every address ever seen keeps its bucket for the life of the worker.
+        self._calls += 1
+        if self._calls % self.CLEANUP_EVERY == 0:
+            cutoff = now - self._idle_ttl
+            self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[1] >= cutoff}
+
+
+class SQLiteRateLimitStore(RateLimitStore):
+    """Token buckets in a SQLite file shared by every worker on the host.
+
+    Each consume is one short ``BEGIN IMMEDIATE`` transaction, so buckets stay
+    consistent across processes without a network round trip. Waiting for the
+    write lock blocks, so the middleware calls it from a thread; every thread
+    has its own connection and SQLite does the locking.
+    """
+
+    CLEANUP_EVERY = 1000
+    blocking = True
+
+    def __init__(self, path: Path, idle_ttl: float = 3600.0):
+        self._path = Path(path)
+        self._idle_ttl = idle_ttl
+        self._local = threading.local()
+        self._calls = itertools.count(1)
+
+    def _connection(self) -> sqlite3.Connection:
+        # uvicorn may fork workers after import; never share a handle across processes.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def consume(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens = float(burst) if row is None else _refill(row[0], row[1], now, rate, burst)
+                wait = 0.0
+                if tokens >= cost:
+                    tokens -= cost
+                else:
+                    wait = (cost - tokens) / rate
+                conn.execute(
+                    "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (key, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._maybe_cleanup(conn, now)
+            return wait
+        except sqlite3.Error as e:
+            # Fail open: a broken limiter must not take the API down with it.
+            logger.warning(f"Rate limit store unavailable, admitting request: {e}")
+            return 0.0
+
+    def _maybe_cleanup(self, conn: sqlite3.Connection, now: float) -> None:
+        if next(self._calls) % self.CLEANUP_EVERY == 0:
+            conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self._idle_ttl,))
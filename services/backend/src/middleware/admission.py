@@ -0,0 +1,116 @@
+import asyncio
+import ipaddress
+import math
+from typing import Iterable, List, Optional, Union
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.exceptions.api_errors import APIError, ServerBusyError, TooManyRequestsError
+from src.interfaces.limits import RateLimitStore
+from src.limits.dependencies import get_rate_limit_store
+from src.settings.config import config
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+READ_METHODS = {"GET", "HEAD"}
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _parse_networks(values: Iterable[str]) -> List[Network]:
+    return [ipaddress.ip_network(value.strip(), strict=False) for value in values]
+
+
+class AdmissionControlMiddleware:
+    """Per-client token buckets plus a bounded number of in-flight uploads.
+
+    Runs as plain ASGI in front of the routes so rejected uploads are answered
+    before their multipart body is spooled to disk.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            store: Optional[RateLimitStore] = None,
+            exempt_paths: Iterable[str] = ("/",),
+            trusted_proxies: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self._store = store or get_rate_limit_store()
+        self._exempt_paths = set(exempt_paths)
+        self._trusted_proxies = _parse_networks(
+            config.TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+        )
+        self._upload_slots = asyncio.Semaphore(config.UPLOAD_MAX_IN_FLIGHT)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not config.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        if method == "OPTIONS" or path in self._exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if method in READ_METHODS:
+            budget, rate, burst = "read", config.READ_RATE_LIMIT, config.READ_BURST
+        else:
+            budget, rate, burst = "write", config.WRITE_RATE_LIMIT, config.WRITE_BURST
+
+        client_ip = self._client_ip(scope)
+        key = f"{budget}:{client_ip}"
+        if self._store.blocking:
+            wait = await asyncio.to_thread(self._store.consume, key, rate, burst)
+        else:
+            wait = self._store.consume(key, rate, burst)
+        if wait > 0:
+            logger.warning(f"Rate limited {client_ip}: {method} {path}")
+            await self._reject(TooManyRequestsError(math.ceil(wait)), scope, receive, send)
+            return
+
+        if method == "POST" and path.rstrip("/") == "/upload":
+            try:
+                await asyncio.wait_for(self._upload_slots.acquire(), config.UPLOAD_QUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Upload queue full, rejecting {client_ip}")
+                retry_after = max(1, math.ceil(config.UPLOAD_QUEUE_TIMEOUT))
+                await self._reject(ServerBusyError(retry_after), scope, receive, send)
+                return
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self._upload_slots.release()
+            return
+
+        await self.app(scope, receive, send)
+
+    def _client_ip(self, scope: Scope) -> str:
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        if not self._is_trusted(peer):
+            return peer
+        for name, value in scope.get("headers", ()):
+            if name == b"x-real-ip":
+                return value.decode("latin-1").strip()
+        return peer
+
+    def _is_trusted(self, peer: str) -> bool:
+        try:
+            address = ipaddress.ip_address(peer)
+        except ValueError:
+            return False
+        return any(address in network for network in self._trusted_proxies)
+
+    @staticmethod
+    async def _reject(error: APIError, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            status_code=error.status_code,
+            content={"detail": error.message},
+            headers={"Retry-After": str(error.retry_after)},
+        )
+        await response(scope, receive, send)
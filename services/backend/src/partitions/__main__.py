@@ -0,0 +1,42 @@
+"""Partition maintenance and retention, for cron or a one-off run.
+
+    python -m src.partitions --retention-months 12 --dry-run
+"""
+import argparse
+
+from src.db.dependencies import get_image_repository
+from src.db.session import close_connection_pool
+from src.handlers.dependencies import get_file_handler
+from src.partitions.service import PartitionService
+from src.settings.config import config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming image partitions and drop expired ones")
+    parser.add_argument("--retention-months", type=int, default=config.RETENTION_MONTHS, help="0 keeps everything")
+    parser.add_argument("--months-ahead", type=int, default=config.PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--dry-run", action="store_true", help="only list the months that would be dropped")
+    args = parser.parse_args()
+
+    service = PartitionService(
+        get_image_repository(),
+        get_file_handler(),
+        retention_months=args.retention_months,
+        months_ahead=args.months_ahead,
+    )
+    try:
+        service.ensure_partitions()
+        result = service.apply_retention(dry_run=args.dry_run)
+    finally:
+        close_connection_pool()
+
+    if not result.months:
+        print("Nothing to drop")
+    elif args.dry_run:
+        print(f"Would drop: {', '.join(result.months)}")
+    else:
+        print(f"Dropped {', '.join(result.months)}: {result.rows_dropped} rows, {result.files_deleted} files")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.partitions.service import PartitionService
+
+_partition_service: Optional["PartitionService"] = None
+
+def get_partition_service() -> "PartitionService":
+    global _partition_service
+    if _partition_service is None:
+        from src.db.dependencies import get_image_repository
+        from src.handlers.dependencies import get_file_handler
+        from src.partitions.service import PartitionService
+
+        _partition_service = PartitionService(get_image_repository(), get_file_handler())
+    return _partition_service
@@ -0,0 +1,77 @@
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional
+
+from src.interfaces.handlers import FileHandlerInterface
+from src.interfaces.repositories import ImageRepository
+from src.settings.config import config
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass
+class RetentionResult:
+    months: List[str] = field(default_factory=list)
+    rows_dropped: int = 0
+    files_deleted: int = 0
+
+
+class PartitionService:
+    """Creates upcoming monthly partitions and drops the ones past retention.
+
+    A month is only dropped once it lies entirely outside the retention
+    window: with RETENTION_MONTHS=12 in October 2026, everything uploaded
+    before November 2025 goes. Rows are removed by dropping the partition and
+    the files are deleted afterwards, so a crash in between leaves orphaned
+    files rather than rows pointing at missing ones.
+    """
+
+    def __init__(
+            self,
+            repository: ImageRepository,
+            file_handler: FileHandlerInterface,
+            retention_months: Optional[int] = None,
+            months_ahead: Optional[int] = None,
+    ):
+        self._repository = repository
+        self._file_handler = file_handler
+        self._retention_months = config.RETENTION_MONTHS if retention_months is None else retention_months
+        self._months_ahead = config.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+
+    def ensure_partitions(self) -> int:
+        created = self._repository.ensure_partitions(months_ahead=self._months_ahead)
+        if created:
+            logger.info(f"Created {created} image partitions")
+        return created
+
+    def expired_months(self, today: Optional[date] = None) -> List[date]:
+        if self._retention_months <= 0:
+            return []
+        current = (today or date.today()).replace(day=1)
+        cutoff = add_months(current, -(self._retention_months - 1))
+        return [month for month in self._repository.list_partition_months() if month < cutoff]
+
+    def apply_retention(self, today: Optional[date] = None, dry_run: bool = False) -> RetentionResult:
+        result = RetentionResult()
+        for month in self.expired_months(today):
+            result.months.append(month.strftime("%Y-%m"))
+            if dry_run:
+                continue
+
+            dropped = self._repository.drop_partition_month(month)
+            deleted = self._file_handler.delete_files(dropped.filenames)
+            result.rows_dropped += dropped.image_count
+            result.files_deleted += deleted
+            logger.info(f"Dropped partition {month:%Y-%m}: {dropped.image_count} rows, {deleted} files deleted")
+        return result
+
+    def run(self, today: Optional[date] = None) -> RetentionResult:
+        self.ensure_partitions()
+        return self.apply_retention(today)
@@ -1,3 +1,6 @@
+import tempfile
+from typing import Optional, cast
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 
@@ -25,9 +28,76 @@ class AppConfig(BaseSettings):
     PGBOUNCER_HOST: str
     PGBOUNCER_PORT: int
     USE_PGBOUNCER: bool = True
+
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_WARMUP_TIMEOUT: float = 30.0
+    DB_READINESS_TIMEOUT: float = 2.0
     
     MAX_FILE_SIZE: int = 5 * 1024 * 1024
-    SUPPORTED_FORMATS: set[str] = {'.jpg', '.png', '.gif'}
+    SUPPORTED_FORMATS: set[str] = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif'}
+
+    IMAGE_NORMALIZE: bool = True
+    IMAGE_MAX_DIMENSION: int = 2560
+    IMAGE_VARIANT_FORMATS: list[str] = ['.avif', '.webp']
+    JPEG_QUALITY: int = 85
+    WEBP_QUALITY: int = 80
+    AVIF_QUALITY: int = 60
+
+    SIMILARITY_INDEX_ENABLED: bool = True
+    SIMILARITY_MAX_DISTANCE: int = 10
+    SIMILARITY_LOAD_BATCH: int = 50_000
+    SIMILARITY_REBUILD_INTERVAL: float = 3600.0
+    REJECT_NEAR_DUPLICATES: bool = False
+    NEAR_DUPLICATE_DISTANCE: int = 4
+
+    RATE_LIMIT_ENABLED: bool = True
+    # X-Real-IP is only believed from these peers (addresses or networks);
+    # anyone else is limited by the address they connect from.
+    TRUSTED_PROXIES: list[str] = ['127.0.0.1', '::1']
+    # Buckets live in a SQLite file shared by all workers on the host;
+    # disable to fall back to per-process in-memory buckets.
+    RATE_LIMIT_SHARED_STORE: bool = True
+    RATE_LIMIT_DB_PATH: Path = Path(tempfile.gettempdir()) / "upload-server" / "rate_limits.sqlite3"
+    READ_RATE_LIMIT: float = 20.0
+    READ_BURST: int = 60
+    WRITE_RATE_LIMIT: float = 1.0
+    WRITE_BURST: int = 10
+    UPLOAD_MAX_IN_FLIGHT: int = 4
+    UPLOAD_QUEUE_TIMEOUT: float = 5.0
+
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_MAINTENANCE_INTERVAL: float = 6 * 3600.0
+    # Until the current month's partition exists the worker is not ready; retried this often.
+    PARTITION_RETRY_INTERVAL: float = 5.0
+    # Whole months older than this are dropped together with their files; 0 keeps everything.
+    RETENTION_MONTHS: int = 0
+
+    # Per-worker cache of GET /upload/{filename} lookups; 0 disables it. Deletes
+    # evict it on every worker through the event stream, the TTL bounds staleness
+    # when events are disabled.
+    FILENAME_CACHE_SIZE: int = 10_000
+    FILENAME_CACHE_TTL: float = 30.0
+
+    EVENTS_ENABLED: bool = True
+    EVENTS_HISTORY_SIZE: int = 1000
+    EVENTS_QUEUE_SIZE: int = 100
+    EVENTS_MAX_SUBSCRIBERS: int = 1000
+    EVENTS_HEARTBEAT_INTERVAL: float = 15.0
+    # Streams are closed after this long and the browser resumes with Last-Event-ID,
+    # so a deploy never waits on idle connections for more than a few minutes.
+    EVENTS_MAX_STREAM_DURATION: float = 300.0
+    EVENTS_RECONNECT_DELAY: float = 1.0
+
+    # Off by default: the archive holds every image, and a slow reader keeps its
+    # snapshot open and holds back vacuum. Operators can use python -m src.archive.
+    EXPORT_ENABLED: bool = False
+    # Each export holds one pooled connection in a long read-only transaction.
+    EXPORT_MAX_CONCURRENT: int = 1
+    EXPORT_BATCH_SIZE: int = 1000
+    IMPORT_WORKERS: int = 8
     
     model_config = SettingsConfigDict(
         env_file = str(BASE_DIR / ".env"),
@@ -52,6 +122,21 @@ class AppConfig(BaseSettings):
     def db_url(self) -> str:
         return self.pgbouncer_url if self.USE_PGBOUNCER else self.database_url
 
-    
-config = AppConfig()
-    
\ No newline at end of file
+
+_config: Optional[AppConfig] = None
+
+def get_config() -> AppConfig:
+    global _config
+    if _config is None:
+        _config = AppConfig()
+    return _config
+
+
+class _LazyConfig:
+    # Reading .env and validating settings is deferred to the first attribute access,
+    # so importing modules that reference `config` stays cheap.
+    def __getattr__(self, name: str):
+        return getattr(get_config(), name)
+
+
+config = cast(AppConfig, _LazyConfig())
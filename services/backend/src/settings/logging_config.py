@@ -1,9 +1,35 @@
 import logging
 
 from pathlib import Path
+from typing import Optional
 
 from src.settings.config import config
 
+
+class DeferredFileHandler(logging.Handler):
+    """Opens the log file (and creates LOG_DIR) on the first record it writes."""
+
+    def __init__(self, level: int = logging.NOTSET):
+        super().__init__(level)
+        self._handler: Optional[logging.FileHandler] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._handler is None:
+            log_file: Path = config.LOG_DIR / "app.log"
+
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+
+            self._handler = logging.FileHandler(log_file, encoding="utf-8")
+            self._handler.setFormatter(self.formatter)
+
+        self._handler.emit(record)
+
+    def close(self) -> None:
+        if self._handler is not None:
+            self._handler.close()
+        super().close()
+
+
 def get_logger(name: str = __name__) -> logging.Logger:
     logger = logging.getLogger(name)
 
@@ -16,11 +42,7 @@ def get_logger(name: str = __name__) -> logging.Logger:
         console_handler.setFormatter(console_formatter)
         logger.addHandler(console_handler)
 
-        log_file: Path = config.LOG_DIR / "app.log"
-
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler = DeferredFileHandler()
 
         file_handler.setLevel(logging.WARNING)
 
@@ -0,0 +1,16 @@
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.similarity.service import SimilarityService
+
+_similarity_service: Optional["SimilarityService"] = None
+
+def get_similarity_service() -> "SimilarityService":
+    global _similarity_service
+    if _similarity_service is None:
+        # NumPy is imported on first use, like psycopg in src.db.dependencies.
+        from src.db.dependencies import get_image_repository
+        from src.similarity.service import SimilarityService
+
+        _similarity_service = SimilarityService(get_image_repository())
+    return _similarity_service
@@ -0,0 +1,39 @@
+import numpy as np
+
+
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+
+def dhash(image, hash_size: int = HASH_SIZE) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a
+    (hash_size + 1) x hash_size grayscale thumbnail. Survives re-encoding,
+    resizing and mild colour changes; returned as an unsigned 64-bit int."""
+    from PIL import Image
+
+    # Let the JPEG decoder skip most of the work by decoding at a reduced scale.
+    image.draft("L", (hash_size * 8, hash_size * 8))
+    gray = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = np.asarray(gray, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash_file(path: str) -> int:
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return dhash(image)
+
+
+def to_signed(value: int) -> int:
+    # Postgres has no unsigned BIGINT; store the same 64 bits as a signed value.
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
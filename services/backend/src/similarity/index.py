@@ -0,0 +1,120 @@
+import threading
+from itertools import combinations
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from src.similarity.hashing import HASH_BITS
+
+
+class HammingIndex:
+    """In-memory multi-index hashing over 64-bit perceptual hashes.
+
+    Every hash is split into ``chunks`` 16-bit substrings, each kept in a sorted
+    array. Two hashes within distance ``r`` agree within ``r // chunks`` bits on
+    at least one substring, so a query only enumerates the few substrings around
+    its own and verifies the candidates with a vectorised popcount. Radii too
+    large for that fall back to a full scan, which NumPy still does in a few ms
+    per million hashes.
+
+    New hashes go to a small unsorted tail that is merged in batches.
+    """
+
+    CHUNKS = 4
+    MAX_FLIPS = 1
+    MERGE_THRESHOLD = 4096
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._masks = self._flip_masks()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids = np.empty(0, dtype=np.int64)
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._chunk_values: List[np.ndarray] = []
+        self._chunk_order: List[np.ndarray] = []
+        self._pending_ids: List[int] = []
+        self._pending_hashes: List[int] = []
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids) + len(self._pending_ids)
+
+    def add(self, image_id: int, value: int) -> None:
+        self.add_many([image_id], [value])
+
+    def add_many(self, ids: Iterable[int], values: Iterable[int]) -> None:
+        with self._lock:
+            for image_id, value in zip(ids, values):
+                self._pending_ids.append(image_id)
+                self._pending_hashes.append(value & 0xFFFFFFFFFFFFFFFF)
+            if len(self._pending_ids) >= self.MERGE_THRESHOLD:
+                self._merge()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def search(self, value: int, max_distance: int, limit: int = 20) -> List[Tuple[int, int]]:
+        """Return ``(id, distance)`` pairs within ``max_distance``, nearest first."""
+        query = np.uint64(value & 0xFFFFFFFFFFFFFFFF)
+        with self._lock:
+            if max_distance // self.CHUNKS > self.MAX_FLIPS:
+                ids, hashes = self._ids, self._hashes
+            else:
+                positions = self._candidates(query, max_distance)
+                ids, hashes = self._ids[positions], self._hashes[positions]
+
+            if self._pending_ids:
+                ids = np.concatenate((ids, np.asarray(self._pending_ids, dtype=np.int64)))
+                hashes = np.concatenate((hashes, np.asarray(self._pending_hashes, dtype=np.uint64)))
+
+        distances = np.bitwise_count(hashes ^ query)
+        matched = np.flatnonzero(distances <= max_distance)
+        ids, distances = ids[matched], distances[matched]
+        nearest = np.lexsort((ids, distances))[:limit]
+        return [(int(ids[i]), int(distances[i])) for i in nearest]
+
+    def _candidates(self, query: np.uint64, max_distance: int) -> np.ndarray:
+        if not len(self._hashes):
+            return np.empty(0, dtype=np.int64)
+
+        flips = max_distance // self.CHUNKS
+        ranges = []
+        for chunk, (values, order) in enumerate(zip(self._chunk_values, self._chunk_order)):
+            substring = np.uint16((int(query) >> (chunk * self._chunk_bits)) & 0xFFFF)
+            probes = np.unique(substring ^ self._masks[flips])
+            left = np.searchsorted(values, probes, side="left")
+            right = np.searchsorted(values, probes, side="right")
+            ranges.extend(order[lo:hi] for lo, hi in zip(left, right) if hi > lo)
+
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(ranges))
+
+    def _merge(self) -> None:
+        self._ids = np.concatenate((self._ids, np.asarray(self._pending_ids, dtype=np.int64)))
+        self._hashes = np.concatenate((self._hashes, np.asarray(self._pending_hashes, dtype=np.uint64)))
+        self._pending_ids, self._pending_hashes = [], []
+
+        self._chunk_values, self._chunk_order = [], []
+        for chunk in range(self.CHUNKS):
+            values = ((self._hashes >> np.uint64(chunk * self._chunk_bits)) & np.uint64(0xFFFF)).astype(np.uint16)
+            order = np.argsort(values, kind="stable").astype(np.int32)
+            self._chunk_values.append(values[order])
+            self._chunk_order.append(order)
+
+    @property
+    def _chunk_bits(self) -> int:
+        return HASH_BITS // self.CHUNKS
+
+    def _flip_masks(self) -> List[np.ndarray]:
+        # masks[k] holds every 16-bit pattern with at most k bits set.
+        masks = []
+        for k in range(self.MAX_FLIPS + 1):
+            patterns = [0]
+            for flips in range(1, k + 1):
+                patterns += [sum(1 << bit for bit in bits) for bits in combinations(range(self._chunk_bits), flips)]
+            masks.append(np.asarray(patterns, dtype=np.uint16))
+        return masks
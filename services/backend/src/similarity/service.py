@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.db.dto import ImageDetailsDTO
+from src.interfaces.repositories import ImageRepository
+from src.similarity.hashing import dhash_file, to_signed, to_unsigned
+from src.similarity.index import HammingIndex
+from src.settings.config import config
+from src.settings.logging_config import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class SimilarityService:
+    """Keeps a worker-local HammingIndex in sync with the ``images`` table.
+
+    Each lookup first pulls rows with an id above the highest one loaded from
+    the table, so uploads from other workers show up immediately. Rows this
+    worker adds itself do not move that watermark: another worker may still
+    commit a lower id. Deleted rows are dropped when candidates are resolved
+    against the table; rebuild() sheds them (and any row whose id committed
+    out of order) and is run periodically from the lifespan, off the request
+    path.
+    """
+
+    def __init__(
+            self,
+            repository: ImageRepository,
+            index: Optional[HammingIndex] = None,
+            batch_size: Optional[int] = None,
+    ):
+        self._repository = repository
+        self._index = index or HammingIndex()
+        self._batch_size = batch_size or config.SIMILARITY_LOAD_BATCH
+        self._refresh_lock = threading.Lock()
+        # add() runs on the request path, so it must not wait for a full load.
+        self._ids_lock = threading.Lock()
+        self._loaded_id = 0
+        # Added locally above _loaded_id (id -> unsigned hash); skipped when
+        # refresh() reaches them and carried over by rebuild().
+        self._added: Dict[int, int] = {}
+
+    def refresh(self) -> None:
+        with self._refresh_lock:
+            started, loaded = time.perf_counter(), 0
+            while True:
+                rows = self._repository.list_hashes(self._loaded_id, self._batch_size)
+                if not rows:
+                    break
+                with self._ids_lock:
+                    self._loaded_id = rows[-1][0]
+                    new_rows = [row for row in rows if row[0] not in self._added]
+                    self._index.add_many((row[0] for row in new_rows), (to_unsigned(row[1]) for row in new_rows))
+                    self._added = {i: h for i, h in self._added.items() if i > self._loaded_id}
+                loaded += len(new_rows)
+                if len(rows) < self._batch_size:
+                    break
+
+            if loaded > 1000:
+                logger.info(f"Similarity index loaded {loaded} hashes in {time.perf_counter() - started:.2f}s")
+
+    def rebuild(self) -> None:
+        # Loaded into a separate index without holding any lock, so lookups
+        # keep using the current one and only wait for the swap.
+        started = time.perf_counter()
+        index, loaded_id = HammingIndex(), 0
+        while True:
+            rows = self._repository.list_hashes(loaded_id, self._batch_size)
+            if not rows:
+                break
+            index.add_many((row[0] for row in rows), (to_unsigned(row[1]) for row in rows))
+            loaded_id = rows[-1][0]
+            if len(rows) < self._batch_size:
+                break
+
+        with self._refresh_lock, self._ids_lock:
+            carried = {i: h for i, h in self._added.items() if i > loaded_id}
+            index.add_many(carried.keys(), carried.values())
+            # Rows between loaded_id and the old watermark are pulled by the next refresh().
+            self._index, self._loaded_id, self._added = index, loaded_id, carried
+
+        logger.info(f"Similarity index rebuilt with {len(index)} hashes in {time.perf_counter() - started:.2f}s")
+
+    @staticmethod
+    def hash_file(path: str) -> int:
+        # Signed, as stored in images.phash.
+        return to_signed(dhash_file(path))
+
+    def add(self, image_id: int, phash: int) -> None:
+        with self._ids_lock:
+            if image_id <= self._loaded_id or image_id in self._added:
+                return
+            self._added[image_id] = to_unsigned(phash)
+            self._index.add(image_id, self._added[image_id])
+
+    def find_similar(
+            self,
+            phash: int,
+            max_distance: int,
+            limit: int,
+            exclude_id: Optional[int] = None,
+    ) -> List[Tuple[ImageDetailsDTO, int]]:
+        self.refresh()
+        # Over-fetch a little: some candidates may have been deleted meanwhile.
+        matches = [
+            (image_id, distance)
+            for image_id, distance in self._index.search(to_unsigned(phash), max_distance, limit * 2 + 1)
+            if image_id != exclude_id
+        ]
+        if not matches:
+            return []
+
+        images = {image.id: image for image in self._repository.get_by_ids([image_id for image_id, _ in matches])}
+        return [(images[image_id], distance) for image_id, distance in matches if image_id in images][:limit]
+
+    def find_duplicate(self, phash: int, max_distance: int) -> Optional[Tuple[ImageDetailsDTO, int]]:
+        similar = self.find_similar(phash, max_distance, limit=1)
+        return similar[0] if similar else None
@@ -2,6 +2,7 @@
 
     const API_UPLOAD_URL = `${location.origin}/api/upload/`;
     const API_DELETE_URL = (fn) => `${location.origin}/api/upload/${encodeURIComponent(fn)}`;
+    const API_EVENTS_URL = `${location.origin}/api/upload/events`;
 
     const LS_KEYS = {
         PER_PAGE: 'image_host_per_page',
@@ -401,7 +402,7 @@
             return;
         }
 
-        const allowedTypes = ['image/jpeg', 'image/png', 'image/gif'];
+        const allowedTypes = ['image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/avif'];
         const maxSize = 5 * 1024 * 1024;
 
         /**
@@ -522,6 +523,10 @@
             return;
         }
 
+        let galleryLoaded = false;
+        let eventsLive = false;
+        const locallyDeleted = new Set();
+
         /**
          * Update UI selects with current pagination state
          */
@@ -550,6 +555,25 @@
             );
         };
 
+        /**
+         * Adjust item and page totals after an image was added or removed.
+         * @param {number} delta - Change in the number of images.
+         */
+        const updateTotals = (delta) => {
+            paginationState.totalItems = Math.max(0, paginationState.totalItems + delta);
+            paginationState.totalPages = Math.max(
+                1,
+                Math.ceil(paginationState.totalItems / paginationState.perPage)
+            );
+        };
+
+        /**
+         * Find the gallery card of an image, if it is on the current page.
+         * @param {string} filename - Name of the image file.
+         * @returns {HTMLElement|null}
+         */
+        const findCard = (filename) => imgGallery.querySelector(`.image-card[data-filename="${CSS.escape(filename)}"]`);
+
         /**
          * Delete a specific image by filename.
          * @param {string} filename - Name of file to delete.
@@ -563,16 +587,15 @@
                 return;
             }
 
+            // The stream will report this delete too; it must not be counted twice.
+            locallyDeleted.add(filename);
+
             try {
                 await api('delete', API_DELETE_URL(filename));
                 console.log('[deleteImage] Delete successful, removing card');
                 card.remove();
 
-                paginationState.totalItems--;
-                paginationState.totalPages = Math.max(
-                    1,
-                    Math.ceil(paginationState.totalItems / paginationState.perPage)
-                );
+                updateTotals(-1);
 
                 console.log('[deleteImage] Updated pagination after delete:', paginationState);
 
@@ -588,6 +611,7 @@
                     updatePaginationUI();
                 }
             } catch (e) {
+                locallyDeleted.delete(filename);
                 console.error('[deleteImage] Delete failed:', e);
                 alert(`Delete failed: ${e.message}`);
             }
@@ -606,6 +630,7 @@
 
             const card = document.createElement('div');
             card.className = 'image-card';
+            card.dataset.filename = filename;
             card.innerHTML = `
                 <div class="image-card-preview">
                     <img src="${imageUrl}" alt="${filename}" loading="lazy" />
@@ -696,6 +721,7 @@
                 });
 
                 imgGallery.appendChild(fragment);
+                galleryLoaded = true;
                 updatePaginationUI();
 
                 if (paginationControls) {
@@ -710,6 +736,82 @@
             }
         };
 
+        /**
+         * Update pagination controls, but leave the URL alone while another tab is shown.
+         */
+        const refreshPaginationUI = () => {
+            if (!imgSection.classList.contains('hidden')) updatePaginationUI();
+        };
+
+        /**
+         * Show an image uploaded anywhere (this or another client) without refetching the list.
+         * @param {object} image - Image details from the "created" event.
+         */
+        const applyCreated = (image) => {
+            if (!galleryLoaded || findCard(image.filename)) return;
+
+            updateTotals(1);
+
+            // Only the first page of the newest-first view shows new uploads.
+            if (paginationState.sortOrder === 'desc' && paginationState.currentPage === 1) {
+                imgGallery.querySelector('.no-images-msg')?.remove();
+                imgGallery.prepend(createImageCard(image));
+
+                const cards = imgGallery.querySelectorAll('.image-card');
+                if (cards.length > paginationState.perPage) cards[cards.length - 1].remove();
+            }
+            refreshPaginationUI();
+        };
+
+        /**
+         * Drop an image deleted by another client from the view.
+         * @param {string} filename - Name of the deleted file.
+         */
+        const applyDeleted = (filename) => {
+            if (locallyDeleted.delete(filename) || !galleryLoaded) return;
+
+            updateTotals(-1);
+
+            const card = findCard(filename);
+            if (card) {
+                card.remove();
+                if (!imgGallery.querySelector('.image-card')) {
+                    loadImages();
+                    return;
+                }
+            }
+            refreshPaginationUI();
+        };
+
+        /**
+         * Subscribe to upload/delete events. EventSource reconnects on its own and
+         * sends Last-Event-ID, so the server replays whatever was missed; when it
+         * cannot, it sends "reset" and the page is reloaded from the API.
+         */
+        const subscribeToEvents = () => {
+            if (!window.EventSource) {
+                console.warn('[subscribeToEvents] EventSource not supported, gallery will not update live');
+                return;
+            }
+
+            const source = new EventSource(API_EVENTS_URL);
+
+            source.addEventListener('open', () => {
+                console.log('[subscribeToEvents] Connected');
+                eventsLive = true;
+            });
+            source.addEventListener('error', () => {
+                console.warn('[subscribeToEvents] Disconnected, browser will retry');
+                eventsLive = false;
+            });
+            source.addEventListener('created', (e) => applyCreated(JSON.parse(e.data).image));
+            source.addEventListener('deleted', (e) => applyDeleted(JSON.parse(e.data).filename));
+            source.addEventListener('reset', () => {
+                console.log('[subscribeToEvents] Reset requested, reloading images');
+                if (galleryLoaded) loadImages();
+            });
+        };
+
         if (perPageSelect) {
             perPageSelect.addEventListener('change', () => {
                 const newPerPage = parseInt(perPageSelect.value);
@@ -764,8 +866,17 @@
             console.log('[initImagesTab] nextPageBtn not found, skipping event listener');
         }
 
+        subscribeToEvents();
+
         console.log('[initImagesTab] Setting loadImagesFunction');
-        loadImagesFunction = loadImages;
+        // While the event stream is connected the gallery is already current.
+        loadImagesFunction = () => {
+            if (galleryLoaded && eventsLive) {
+                updatePaginationUI();
+                return;
+            }
+            loadImages();
+        };
         console.log('[initImagesTab] loadImagesFunction is now set:', !!loadImagesFunction);
         console.log('[initImagesTab] Initialization complete');
     }
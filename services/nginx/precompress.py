@@ -0,0 +1,84 @@
+"""Write .gz (and .br when the ``brotli`` package is installed) siblings for
+text assets so nginx can serve them with ``gzip_static``/``brotli_static``.
+
+    python services/nginx/precompress.py services/frontend
+
+Variants are only kept when they are smaller than the source and carry the
+source mtime, as gzip_static expects. Prints before/after sizes.
+"""
+import argparse
+import gzip
+import os
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+TEXT_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt", ".xml", ".map"}
+MIN_SIZE = 256
+
+
+def compress_gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-identical between builds.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def write_variant(source: Path, suffix: str, data: bytes) -> int:
+    target = source.with_name(source.name + suffix)
+    if len(data) >= source.stat().st_size:
+        target.unlink(missing_ok=True)
+        return 0
+    if not target.exists() or target.read_bytes() != data:
+        target.write_bytes(data)
+        os.utime(target, (source.stat().st_atime, source.stat().st_mtime))
+    return len(data)
+
+
+def precompress(root: Path) -> list:
+    encoders = [(".gz", compress_gzip)]
+    if brotli is not None:
+        encoders.append((".br", compress_brotli))
+
+    rows = []
+    for source in sorted(root.rglob("*")):
+        if not source.is_file() or source.suffix.lower() not in TEXT_SUFFIXES:
+            continue
+        size = source.stat().st_size
+        if size < MIN_SIZE:
+            continue
+        data = source.read_bytes()
+        sizes = {suffix: write_variant(source, suffix, encode(data)) for suffix, encode in encoders}
+        rows.append((source.relative_to(root), size, sizes))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompress static frontend assets")
+    parser.add_argument("root", type=Path)
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("brotli is not installed, writing .gz variants only", file=sys.stderr)
+
+    rows = precompress(args.root)
+    total = sum(size for _, size, _ in rows)
+    totals = {}
+
+    print(f"{'asset':<40}{'raw':>10}{'gzip':>10}{'brotli':>10}")
+    for path, size, sizes in rows:
+        for suffix, value in sizes.items():
+            totals[suffix] = totals.get(suffix, 0) + (value or size)
+        print(f"{str(path):<40}{size:>10}{sizes.get('.gz') or '-':>10}{sizes.get('.br') or '-':>10}")
+    print(f"{'total':<40}{total:>10}{totals.get('.gz', '-'):>10}{totals.get('.br', '-'):>10}")
+
+
+if __name__ == "__main__":
+    main()